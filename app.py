@@ -1,99 +1,64 @@
 import streamlit as st
 import pandas as pd
-import copy 
 from datetime import datetime
 import io
 import base64
 
+from scheduler.annealing import DEFAULT_TIME_LIMIT as ANNEAL_DEFAULT_TIME_LIMIT
+from scheduler.backtracking import DEFAULT_NODE_LIMIT, DEFAULT_TIME_LIMIT
+from scheduler.bulk_export import build_timetable_zip
+from scheduler.data import (
+    DAYS_ORDER, TIME_SLOTS_ORDER_24HR, get_classes_to_schedule, process_instructor_data, process_room_data,
+)
+from scheduler.encoding import encode_frame, set_schedule_values
+from scheduler.export import export_schedule_to_csv
+from scheduler.indexes import build_scheduling_index
+from scheduler.instrumentation import PhaseRecorder, append_run_log, profiled
+from scheduler.milp import DEFAULT_TIME_LIMIT as MILP_DEFAULT_TIME_LIMIT, ModelTooLargeError
+from scheduler.multistart import DEFAULT_STARTS
+from scheduler.parse_cache import default_parse_cache
+from scheduler.pipeline import generate_schedule_attempt
+from scheduler.render_cache import RenderCache
+from scheduler.result_cache import default_result_cache, result_cache_key
+from scheduler.snapshot import SNAPSHOT_EXTENSION, load_snapshot, save_snapshot
+from scheduler.timetable import (
+    SubjectColorMap, build_timetable, render_csv_timetable, render_html_grid, render_text_grid,
+)
+from scheduler.verification import double_booking_rows
+
 
 # --- Helper Function Definitions FIRST ---
 # process_instructor_data, process_room_data, get_classes_to_schedule, generate_schedule_attempt
-# (Assume these functions are defined here as before)
-# Paste your existing functions here:
-
-# Add these near the top of your app.py, or in a config section
-DAYS_ORDER = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]
-
-TIME_SLOTS_ORDER_24HR = [
-    "7:00-8:00", "8:00-9:00", "9:00-10:00", "10:00-11:00", 
-    "11:00-12:00", "12:00-13:00", "13:00-14:00", "14:00-15:00", 
-    "15:00-16:00", "16:00-17:00", "17:00-18:00"  #if your schedule extends later
-]
-
-def clean_html_for_export(html_string):
-    """Remove HTML tags from string for clean CSV export."""
-    if not html_string:
-        return ''
-    
-    # Remove HTML tags
-    import re
-    
-    # First, replace <br> and </div> with newlines
-    cleaned = html_string.replace('<br>', '\n').replace('</div>', '\n')
-    
-    # Remove all HTML tags
-    cleaned = re.sub('<[^<]+?>', '', cleaned)
-    
-    # Clean up multiple newlines
-    cleaned = re.sub('\n+', '\n', cleaned).strip()
-    
-    return cleaned
+# live in the scheduler package (no Streamlit) so the command line can run them too.
+
+# Run tab display label -> engine name accepted by generate_schedule_attempt
+SCHEDULER_ENGINES = {
+    "Bitset Greedy (fast)": "bitset",
+    "Standard Greedy": "standard",
+    "Backtracking (MRV + forward checking)": "backtracking",
+    "Multi-start Randomized Greedy (parallel)": "multistart",
+    "Two-phase (slot coloring + matching)": "decomposition",
+    "Exact MILP (HiGHS, small datasets)": "milp",
+}
+
+# Double-booking conflict type -> (label, conflict key) of the teacher, room or section booked twice
+DOUBLE_BOOKING_LABELS = {
+    'Teacher Double Booking': ('Teacher', 'instructor'),
+    'Room Double Booking': ('Room', 'room'),
+    'Section Double Booking': ('Section', 'section'),
+}
 
 def export_timetable_as_csv(schedule_df, entity_type=None, selected_entity=None):
     """Create a CSV-friendly version of the timetable."""
     if schedule_df is None or schedule_df.empty:
         return "No data to export"
     
-    # Filter the schedule based on selection
-    filtered_schedule = schedule_df.copy()
-    filtered_schedule['Day'] = filtered_schedule['Day'].str.upper()
-    
-    if entity_type and selected_entity and selected_entity != "All":
-        if entity_type == "Room":
-            filtered_schedule = filtered_schedule[filtered_schedule['Room'] == selected_entity]
-        elif entity_type == "Section":
-            filtered_schedule = filtered_schedule[filtered_schedule['Section'] == selected_entity]
-        elif entity_type == "Instructor":
-            filtered_schedule = filtered_schedule[filtered_schedule['Instructor'] == selected_entity]
+    # Filter the schedule based on selection and collect each cell's classes
+    grid = build_timetable(schedule_df, entity_type, selected_entity)
     
-    if filtered_schedule.empty:
+    if not grid.cells:
         return "No data matches the current filter"
     
-    # Create timetable structure
-    timetable_data = {}
-    
-    for _, row in filtered_schedule.iterrows():
-        time_slot = row['Time Slot']
-        day = row['Day']
-        
-        if time_slot not in timetable_data:
-            timetable_data[time_slot] = {d: [] for d in DAYS_ORDER}
-        
-        # Create cell content
-        cell_info = f"{row['Subject Code']}"
-        if entity_type == "Section":
-            cell_info += f" | Room: {row['Room']} | Prof: {row['Instructor']}"
-        elif entity_type == "Instructor":
-            cell_info += f" | Room: {row['Room']} | Sec: {row['Section']}"
-        elif entity_type == "Room":
-            cell_info += f" | Sec: {row['Section']} | Prof: {row['Instructor']}"
-        else:
-            cell_info += f" | {row['Section']} | {row['Instructor']} | {row['Room']}"
-        
-        timetable_data[time_slot][day].append(cell_info)
-    
-    # Convert to DataFrame
-    rows = []
-    for time_slot in TIME_SLOTS_ORDER_24HR:
-        if time_slot in timetable_data:
-            row_data = {'Time': format_time_slot_for_display(time_slot)}
-            for day in DAYS_ORDER:
-                entries = timetable_data[time_slot].get(day, [])
-                row_data[day] = ' || '.join(entries) if entries else ''
-            rows.append(row_data)
-    
-    timetable_df = pd.DataFrame(rows)
-    
     # Add header information
     header_info = f"DHVSU Class Schedule - Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}\n"
     if entity_type and selected_entity and selected_entity != "All":
@@ -101,60 +66,10 @@ def export_timetable_as_csv(schedule_df, entity_type=None, selected_entity=None)
     header_info += "\n"
     
     # Convert to CSV
-    csv_content = header_info + timetable_df.to_csv(index=False)
+    csv_content = header_info + render_csv_timetable(grid).to_csv(index=False)
     
     return csv_content
 
-def get_color_for_subject(subject_code, subject_codes_list=None):
-    """Generate a consistent color for each subject code."""
-    # Define a palette of distinct colors
-    color_palette = [
-        '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57',
-        '#FF9FF3', '#54A0FF', '#48DBFB', '#1DD1A1', '#FFA502',
-        '#5F27CD', '#00D2D3', '#A29BFE', '#FD79A8', '#FDCB6E',
-        '#6C5CE7', '#A8E6CF', '#FFD3B6', '#FF8B94', '#C7CEEA',
-        '#B2EBF2', '#DCEDC8', '#FFE0B2', '#F8BBD0', '#E1BEE7',
-        '#C5E1A5', '#FFCCBC', '#D7CCC8', '#CFD8DC', '#B39DDB'
-    ]
-    
-    if subject_codes_list is None:
-        # If no list provided, use hash to get consistent color
-        hash_value = sum(ord(c) for c in subject_code)
-        return color_palette[hash_value % len(color_palette)]
-    else:
-        # If list provided, assign colors in order
-        if subject_code not in subject_codes_list:
-            subject_codes_list.append(subject_code)
-        index = subject_codes_list.index(subject_code)
-        return color_palette[index % len(color_palette)]
-    
-def format_time_slot_for_display(time_slot_24hr):
-    """Converts a 'HH:MM-HH:MM' 24-hour string to 'H:MM AM/PM - H:MM AM/PM' or 'H AM/PM - H AM/PM'."""
-    try:
-        start_str, end_str = time_slot_24hr.split('-')
-        
-        # Use strptime to parse and strftime to format
-        # %I for 12-hour, %M for minute, %p for AM/PM
-        # Using a dummy date because strptime needs a date part
-        start_dt = datetime.strptime(start_str, "%H:%M")
-        end_dt = datetime.strptime(end_str, "%H:%M")
-        
-        # Format without leading zero for hour if it's single digit (e.g., 7 AM instead of 07 AM)
-        # and handle 12 PM/AM correctly.
-        start_display = start_dt.strftime("%I:%M %p").lstrip('0').replace(" 00", " 12") # Handle 12 AM as 12:00 AM not 00:00 AM
-        if start_display.startswith(":"): start_display = "12" + start_display # Correct 00:MM AM to 12:MM AM
-
-        end_display = end_dt.strftime("%I:%M %p").lstrip('0').replace(" 00", " 12")
-        if end_display.startswith(":"): end_display = "12" + end_display
-
-        return f"{start_display} - {end_display}"
-    except ValueError:
-        # Fallback if the format is unexpected
-        return time_slot_24hr
-
-# Generate the display labels for the timetable rows
-TIME_SLOTS_DISPLAY = [format_time_slot_for_display(ts) for ts in TIME_SLOTS_ORDER_24HR]
-
 def check_manual_assignment_conflicts(schedule_df, new_class_details):
     """
     Checks if manually assigning new_class_details would conflict with the existing schedule_df.
@@ -207,239 +122,13 @@ def check_manual_assignment_conflicts(schedule_df, new_class_details):
         
     return found_conflicts
 
-def process_instructor_data(raw_df):
-    if raw_df is None: return None
-    parsed_instructors = {}
-    for _, row in raw_df.iterrows():
-        instructor_name = row['Instructor']
-        day = row['Day']; time_slot = row['Time Slot']; specialization = row['Specialization']
-        if instructor_name not in parsed_instructors:
-            parsed_instructors[instructor_name] = {'availability': [], 'specializations': set()}
-        parsed_instructors[instructor_name]['availability'].append((day, time_slot))
-        parsed_instructors[instructor_name]['specializations'].add(specialization)
-    return parsed_instructors
-
-def process_room_data(raw_df):
-    if raw_df is None: return None
-    parsed_rooms = {}
-    for _, row in raw_df.iterrows():
-        room_name = row['Room']; day = row['Day']; time_slot = row['Time Slot']; capacity = row['Max Capacity']
-        if room_name not in parsed_rooms: parsed_rooms[room_name] = {}
-        parsed_rooms[room_name][(day, time_slot)] = {'capacity': int(capacity), 'is_available': True}
-    return parsed_rooms
-
-def get_classes_to_schedule(sections_df, subjects_df, curriculum_df):
-    if sections_df is None or subjects_df is None or curriculum_df is None:
-        st.warning("One or more required dataframes for generating class list not loaded.")
-        return []
-    classes_list = []
-    subjects_lookup = subjects_df.set_index('Subject Code').to_dict('index')
-    for _, section_row in sections_df.iterrows():
-        section_course = section_row['Course']; section_year_level = section_row['Year Level']
-        section_name = section_row['Section']; section_students = section_row['Students']
-        relevant_curriculum = curriculum_df[
-            (curriculum_df['Course'] == section_course) & (curriculum_df['Year Level'] == section_year_level)]
-        for _, curriculum_row in relevant_curriculum.iterrows():
-            subject_code = curriculum_row['Subject Code']
-            if subject_code in subjects_lookup:
-                subject_details = subjects_lookup[subject_code]
-                classes_list.append({
-                    'section_course': section_course, 'section_year_level': section_year_level,
-                    'section_name': section_name, 'section_students': section_students,
-                    'subject_code': subject_code, 'subject_name': subject_details['Subject Name'],
-                    'required_specialization': subject_details['Required Specialization']})
-            else:
-                st.warning(f"Subject Code '{subject_code}' (curriculum) not in subjects list for section {section_name}.")
-    return classes_list
-
-def generate_schedule_attempt(classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig):
-    """Enhanced scheduling with better conflict prevention."""
-    if not classes_to_schedule or not parsed_instructors_orig or not parsed_rooms_orig:
-        st.warning("Missing necessary data for scheduling.")
-        return [], []
-
-    current_instructors_data = copy.deepcopy(parsed_instructors_orig)
-    current_rooms_availability = copy.deepcopy(parsed_rooms_orig)
-    
-    generated_schedule = []
-    conflicts = []
-    instructor_busy_slots = set()
-    section_busy_slots = set()
-    room_busy_slots = set()  # Enhanced: Track room busy slots
-    
-    # Sort by number of students (largest first)
-    try:
-        sorted_classes_to_schedule = sorted(
-            classes_to_schedule,
-            key=lambda x: x.get('section_students', 0), 
-            reverse=True
-        )
-    except Exception as e:
-        print(f"Error sorting classes: {e}. Using original order.")
-        sorted_classes_to_schedule = classes_to_schedule
-
-    for class_info in sorted_classes_to_schedule:
-        section_name = class_info['section_name']
-        subject_code = class_info['subject_code']
-        subject_name = class_info['subject_name']
-        required_spec = class_info['required_specialization']
-        num_students = class_info['section_students']
-
-        slot_assigned_for_this_class = False
-        
-        # Find specialized teachers
-        specialized_teachers = [
-            instr_name for instr_name, details in parsed_instructors_orig.items()
-            if required_spec in details['specializations']
-        ]
-        
-        if not specialized_teachers:
-            conflicts.append({
-                'type': 'Unscheduled Class', 
-                'section': section_name, 
-                'subject': subject_code,
-                'students': num_students, 
-                'required_specialization': required_spec,
-                'reason': f"No teachers found with specialization: {required_spec}."
-            })
-            continue
-
-        # Find suitable rooms
-        suitable_rooms_by_capacity = []
-        for room_name, room_slots in parsed_rooms_orig.items(): 
-            if any(details['capacity'] >= num_students for details in room_slots.values()):
-                suitable_rooms_by_capacity.append(room_name)
-        
-        if not suitable_rooms_by_capacity:
-            conflicts.append({
-                'type': 'Unscheduled Class', 
-                'section': section_name, 
-                'subject': subject_code,
-                'students': num_students, 
-                'required_specialization': required_spec,
-                'reason': f"No rooms found with capacity >= {num_students} students."
-            })
-            continue
-
-        # Try to assign the class
-        for instructor_name in specialized_teachers:
-            if slot_assigned_for_this_class: 
-                break
-            
-            instr_details = current_instructors_data[instructor_name]
-            
-            for day, time_slot in list(instr_details['availability']):
-                if slot_assigned_for_this_class: 
-                    break
-                
-                # Enhanced checks
-                if (instructor_name, day, time_slot) in instructor_busy_slots:
-                    continue
-                if (section_name, day, time_slot) in section_busy_slots:
-                    continue
-                
-                for room_name in suitable_rooms_by_capacity:
-                    if slot_assigned_for_this_class: 
-                        break
-                    
-                    # Check if room is busy at this time
-                    if (room_name, day, time_slot) in room_busy_slots:
-                        continue
-                    
-                    if (day, time_slot) in current_rooms_availability.get(room_name, {}):
-                        room_slot_details = current_rooms_availability[room_name][(day, time_slot)]
-                        
-                        if room_slot_details['is_available'] and room_slot_details['capacity'] >= num_students:
-                            # Assign the class
-                            generated_schedule.append({
-                                'Section': section_name, 
-                                'Subject Code': subject_code, 
-                                'Subject Name': subject_name,
-                                'Instructor': instructor_name, 
-                                'Room': room_name, 
-                                'Day': day, 
-                                'Time Slot': time_slot,
-                                'Students': num_students, 
-                                'Room Capacity': room_slot_details['capacity']
-                            })
-                            
-                            # Mark slots as busy
-                            instructor_busy_slots.add((instructor_name, day, time_slot))
-                            section_busy_slots.add((section_name, day, time_slot))
-                            room_busy_slots.add((room_name, day, time_slot))
-                            current_rooms_availability[room_name][(day, time_slot)]['is_available'] = False
-                            
-                            slot_assigned_for_this_class = True
-                            break
-
-        if not slot_assigned_for_this_class:
-            conflicts.append({
-                'type': 'Unscheduled Class', 
-                'section': section_name, 
-                'subject': subject_code,
-                'students': num_students, 
-                'required_specialization': required_spec,
-                'reason': 'No common available time slot found for teacher, room, and section.'
-            })
-    
-    # Verify no double bookings in final schedule
-    schedule_df = pd.DataFrame(generated_schedule)
-    if not schedule_df.empty:
-        # Check for any remaining double bookings
-        for idx, row in schedule_df.iterrows():
-            same_teacher = schedule_df[
-                (schedule_df.index != idx) &
-                (schedule_df['Instructor'] == row['Instructor']) &
-                (schedule_df['Day'] == row['Day']) &
-                (schedule_df['Time Slot'] == row['Time Slot'])
-            ]
-            if not same_teacher.empty:
-                conflicts.append({
-                    'type': 'Teacher Double Booking',
-                    'instructor': row['Instructor'],
-                    'day': row['Day'],
-                    'time_slot': row['Time Slot'],
-                    'classes_involved': f"{row['Subject Code']} and {same_teacher.iloc[0]['Subject Code']}"
-                })
-            
-    return generated_schedule, conflicts
-
-def export_schedule_to_csv(schedule_df):
-    """Export schedule to CSV format with enhanced formatting."""
-    if schedule_df is None or schedule_df.empty:
-        return None
-    
-    # Create a copy for export
-    export_df = schedule_df.copy()
-    
-    # Add day ordering for proper sorting
-    day_order = {day: i for i, day in enumerate(DAYS_ORDER)}
-    export_df['day_order'] = export_df['Day'].map(day_order)
-    
-    # Sort by multiple criteria for better organization
-    export_df = export_df.sort_values(['day_order', 'Time Slot', 'Room', 'Section'])
-    
-    # Remove the temporary sorting column
-    export_df = export_df.drop('day_order', axis=1)
-    
-    # Reorder columns for better readability
-    column_order = ['Day', 'Time Slot', 'Subject Code', 'Subject Name', 
-                    'Section', 'Instructor', 'Room', 'Students', 'Room Capacity']
-    
-    # Only include columns that exist
-    export_columns = [col for col in column_order if col in export_df.columns]
-    export_df = export_df[export_columns]
-    
-    # Convert to CSV with proper formatting
-    csv = export_df.to_csv(index=False, encoding='utf-8-sig')  # utf-8-sig for Excel compatibility
-    return csv
-def create_printable_timetable(schedule_df, entity_type=None, selected_entity=None):
+def create_printable_timetable(schedule_df, entity_type=None, selected_entity=None, subject_colors=None):
     """Create a printable HTML version of the timetable."""
     if schedule_df is None or schedule_df.empty:
         return "<p>No schedule data available.</p>"
     
     # Create timetable grid
-    timetable = create_timetable_grid(schedule_df, entity_type, selected_entity)
+    timetable = create_timetable_grid(schedule_df, entity_type, selected_entity, subject_colors)
     
     # Convert to HTML with print-friendly styling
     html = f"""
@@ -499,6 +188,17 @@ def create_printable_timetable(schedule_df, entity_type=None, selected_entity=No
     
     return html
 
+def render_entity_exports(entity_type, entity, entity_df, subject_colors=None):
+    """
+    CSV and printable HTML timetables for one entity, as {extension: text}
+    for build_timetable_zip. Pass the whole schedule's subject_colors so
+    colors match the single-entity export.
+    """
+    return {
+        'csv': export_timetable_as_csv(entity_df, entity_type, entity),
+        'html': create_printable_timetable(entity_df, entity_type, entity, subject_colors),
+    }
+
 def clear_uploaded_files():
     """Clear all uploaded file references from session state."""
     file_keys = ['sections_upload_main', 'instructors_upload_main', 
@@ -514,6 +214,8 @@ def clear_uploaded_files():
         'rooms_raw': False, 'curriculum': False
     }
     
+    st.session_state.upload_digests = {}
+
     # Clear dataframes
     df_keys = ['sections_df', 'instructors_raw_df', 'subjects_df', 
                'rooms_raw_df', 'curriculum_df', 'parsed_instructors', 
@@ -523,100 +225,204 @@ def clear_uploaded_files():
         if key in st.session_state:
             st.session_state[key] = None
 
+def read_uploaded_csv(table, file_obj):
+    """
+    Parse an upload through the shared parse cache, so identical files share
+    one DataFrame, stored with categorical/small-integer columns.
+    """
+    df, digest, _ = default_parse_cache().read_csv(
+        file_obj.getvalue(), table, convert=lambda raw_df: encode_frame(raw_df, table.removesuffix('_raw'))
+    )
+    st.session_state.upload_digests[table] = digest
+    return df
+
+# Snapshot table -> (session DataFrame key, data_loaded_flags key)
+SNAPSHOT_SESSION_TABLES = {
+    'sections': ('sections_df', 'sections'),
+    'instructors': ('instructors_raw_df', 'instructors_raw'),
+    'subjects': ('subjects_df', 'subjects'),
+    'rooms': ('rooms_raw_df', 'rooms_raw'),
+    'curriculum': ('curriculum_df', 'curriculum'),
+}
+
+def build_project_snapshot():
+    """Serialize the session's inputs, class list, schedule, conflicts and manual fixes."""
+    tables = {table: st.session_state.get(key) for table, (key, _) in SNAPSHOT_SESSION_TABLES.items()}
+    tables['classes'] = st.session_state.classes_to_be_scheduled
+    tables['schedule'] = st.session_state.generated_schedule_df
+    if st.session_state.manual_fix_history:
+        tables['manual_fixes'] = pd.DataFrame(st.session_state.manual_fix_history)
+    return save_snapshot(tables, st.session_state.conflicts)
+
+def restore_project_snapshot(snapshot):
+    """
+    Replace the session's data with a loaded snapshot. Parsed instructors,
+    parsed rooms and the scheduling index are rebuilt from its tables, which
+    takes milliseconds.
+    """
+    for table, (key, flag) in SNAPSHOT_SESSION_TABLES.items():
+        st.session_state[key] = snapshot.tables.get(table)
+        st.session_state.data_loaded_flags[flag] = st.session_state[key] is not None
+    st.session_state.parsed_instructors = process_instructor_data(st.session_state.instructors_raw_df)
+    st.session_state.parsed_rooms = process_room_data(st.session_state.rooms_raw_df)
+    st.session_state.scheduling_index = build_scheduling_index(
+        st.session_state.parsed_instructors, st.session_state.parsed_rooms
+    )
+    st.session_state.classes_to_be_scheduled = snapshot.classes()
+    st.session_state.generated_schedule_df = encode_frame(snapshot.tables.get('schedule'), 'schedule')
+    st.session_state.conflicts = snapshot.conflicts
+    manual_fixes = snapshot.tables.get('manual_fixes')
+    st.session_state.manual_fix_history = [] if manual_fixes is None else manual_fixes.to_dict('records')
+    st.session_state.upload_digests = {}
+    st.session_state.phase_timings = []
+    bump_schedule_version()
+
+def bump_schedule_version():
+    """Mark generated_schedule_df as changed so cached timetable renders are not reused."""
+    st.session_state.schedule_version += 1
+
+def record_manual_fix(action, class_details):
+    """
+    Append a manual fix to the session's history, which is saved with project
+    snapshots. Called right after each fix edits generated_schedule_df, so it
+    also bumps the schedule version.
+    """
+    bump_schedule_version()
+    st.session_state.manual_fix_history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'action': action,
+        **{column: str(class_details.get(column, ''))
+           for column in ('Section', 'Subject Code', 'Instructor', 'Room', 'Day', 'Time Slot')},
+    })
+
 def load_all_data_from_session_uploads():
     # Sections
     sections_file_obj = st.session_state.get('sections_upload_main')
     if sections_file_obj is not None and st.session_state.sections_df is None:
         try:
-            df = pd.read_csv(sections_file_obj); st.session_state.sections_df = df
+            df = read_uploaded_csv('sections', sections_file_obj); st.session_state.sections_df = df
             st.session_state.data_loaded_flags['sections'] = True; st.success("Sections data loaded!")
         except Exception as e: st.error(f"Error Sections: {e}"); st.session_state.data_loaded_flags['sections'] = False
     # Instructors
     instructors_file_obj = st.session_state.get('instructors_upload_main')
     if instructors_file_obj is not None and st.session_state.instructors_raw_df is None:
         try:
-            df = pd.read_csv(instructors_file_obj); st.session_state.instructors_raw_df = df
+            df = read_uploaded_csv('instructors_raw', instructors_file_obj); st.session_state.instructors_raw_df = df
             st.session_state.data_loaded_flags['instructors_raw'] = True; st.success("Instructor raw data loaded!")
         except Exception as e: st.error(f"Error Instructors: {e}"); st.session_state.data_loaded_flags['instructors_raw'] = False
     # Subjects
     subjects_file_obj = st.session_state.get('subjects_upload_main')
     if subjects_file_obj is not None and st.session_state.subjects_df is None:
         try:
-            df = pd.read_csv(subjects_file_obj); st.session_state.subjects_df = df
+            df = read_uploaded_csv('subjects', subjects_file_obj); st.session_state.subjects_df = df
             st.session_state.data_loaded_flags['subjects'] = True; st.success("Subjects data loaded!")
         except Exception as e: st.error(f"Error Subjects: {e}"); st.session_state.data_loaded_flags['subjects'] = False
     # Rooms
     rooms_file_obj = st.session_state.get('rooms_upload_main')
     if rooms_file_obj is not None and st.session_state.rooms_raw_df is None:
         try:
-            df = pd.read_csv(rooms_file_obj); st.session_state.rooms_raw_df = df
+            df = read_uploaded_csv('rooms_raw', rooms_file_obj); st.session_state.rooms_raw_df = df
             st.session_state.data_loaded_flags['rooms_raw'] = True; st.success("Rooms raw data loaded!")
         except Exception as e: st.error(f"Error Rooms: {e}"); st.session_state.data_loaded_flags['rooms_raw'] = False
     # Curriculum
     curriculum_file_obj = st.session_state.get('curriculum_upload_main')
     if curriculum_file_obj is not None and st.session_state.curriculum_df is None:
         try:
-            df = pd.read_csv(curriculum_file_obj); st.session_state.curriculum_df = df
+            df = read_uploaded_csv('curriculum', curriculum_file_obj); st.session_state.curriculum_df = df
             st.session_state.data_loaded_flags['curriculum'] = True; st.success("Curriculum mapping loaded!")
         except Exception as e: st.error(f"Error Curriculum: {e}"); st.session_state.data_loaded_flags['curriculum'] = False
 
-def create_timetable_grid(schedule_df, entity_type=None, selected_entity=None):
-    """Create a timetable grid from schedule data with color coding."""
-    if schedule_df is None or schedule_df.empty:
-        return pd.DataFrame(index=TIME_SLOTS_DISPLAY, columns=DAYS_ORDER).fillna('')
+def create_timetable_grid(schedule_df, entity_type=None, selected_entity=None, subject_colors=None):
+    """
+    Create a timetable grid (display slot x day) of color-coded HTML cells.
 
-    schedule_df['Day'] = schedule_df['Day'].str.upper()
+    An HTML rendering of build_timetable's grid; schedule_df is not modified.
+    subject_colors is the SubjectColorMap of the whole schedule (see
+    current_subject_colors); by default one is built from schedule_df.
+    """
+    grid = build_timetable(schedule_df, entity_type, selected_entity)
+    if subject_colors is None:
+        # Colors follow each subject's position among all subject codes, filtered or not
+        subject_colors = SubjectColorMap.from_schedule(schedule_df) if grid.cells else SubjectColorMap()
+    return render_html_grid(grid, subject_colors)
+
+def current_subject_colors():
+    """SubjectColorMap of the generated schedule, rebuilt only when the schedule version changes."""
+    cached = st.session_state.subject_colors
+    if cached is None or cached[0] != st.session_state.schedule_version:
+        cached = (st.session_state.schedule_version,
+                  SubjectColorMap.from_schedule(st.session_state.generated_schedule_df))
+        st.session_state.subject_colors = cached
+    return cached[1]
+
+# Styles for the on-screen timetable; sent in the same markdown element as the table
+TIMETABLE_TABLE_CSS = """
+<style>
+    /* 1️⃣  --- container that locks the overall size --- */
+    .timetable_box {
+        width: 900px;      /*  ⬅️  pick any width  */
+        height: 520px;     /*  ⬅️  pick any height */
+        overflow: auto;    /*  scrollbars when content overflows */
+        margin: 0 auto;    /*  center horizontally (optional) */
+    }
 
-    filtered_schedule = schedule_df.copy()
-    if entity_type and selected_entity and selected_entity != "All":
-        if entity_type == "Room" and "Room" in filtered_schedule.columns:
-            filtered_schedule = filtered_schedule[filtered_schedule['Room'] == selected_entity]
-        elif entity_type == "Section" and "Section" in filtered_schedule.columns:
-            filtered_schedule = filtered_schedule[filtered_schedule['Section'] == selected_entity]
-        elif entity_type == "Instructor" and "Instructor" in filtered_schedule.columns:
-            filtered_schedule = filtered_schedule[filtered_schedule['Instructor'] == selected_entity]
-    
-    if filtered_schedule.empty and selected_entity != "All":
-        return pd.DataFrame(index=TIME_SLOTS_DISPLAY, columns=DAYS_ORDER).fillna('')
+    /* 2️⃣  --- fix the table geometry --- */
+    table.schedule_table {
+        table-layout: fixed;   /* cells obey the width rule below   */
+        width: 100%;           /* stretches to the .timetable_box   */
+        height: 100%;          /* ditto                              */
+        border-collapse: collapse;
+        background: #fff;
+        border-radius: 10px;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+    }
 
-    timetable = pd.DataFrame(index=TIME_SLOTS_DISPLAY, columns=DAYS_ORDER)
-    timetable = timetable.fillna('') 
+    /* 3️⃣  --- cap individual cell sizes --- */
+    table.schedule_table th,
+    table.schedule_table td {
+        width: 120px;      /*  fixed column width    */
+        height: 80px;      /*  fixed row height      */
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+        border: 1px solid #e0e0e0;
+        padding: 8px;
+        text-align: center;
+        vertical-align: middle;
+        font-size: 0.85em;
+    }
 
-    # Get all unique subject codes for consistent color assignment
-    all_subject_codes = sorted(schedule_df['Subject Code'].unique().tolist())
+    /* existing colours & sticky headers … */
+    table.schedule_table th {
+        background: #2E86AB; color: #fff; font-weight: 600;
+        text-transform: uppercase; letter-spacing: 0.5px;
+        position: sticky; top: 0; z-index: 10;
+    }
 
-    for _, row in filtered_schedule.iterrows():
-        day = row['Day']
-        time_slot_24hr_data = row['Time Slot']
-        
-        display_time_slot_for_index = format_time_slot_for_display(time_slot_24hr_data)
-        
-        # Get color for this subject
-        subject_code = row.get('Subject Code', 'N/A')
-        color = get_color_for_subject(subject_code, all_subject_codes)
-        
-        # Create cell content with color styling
-        cell_content = f'<div style="background-color: {color}; color: white; padding: 8px; border-radius: 5px; font-weight: 500; text-shadow: 1px 1px 2px rgba(0,0,0,0.2);">'
-        cell_content += f'<strong>{subject_code}</strong>'
-        
-        if entity_type == "Room": 
-            cell_content += f"<br>Sec: {row.get('Section', 'N/A')}<br>Prof: {row.get('Instructor', 'N/A')[:30]}" 
-        elif entity_type == "Section": 
-            cell_content += f"<br>Room: {row.get('Room', 'N/A')}<br>Prof: {row.get('Instructor', 'N/A')[:30]}"
-        elif entity_type == "Instructor": 
-            cell_content += f"<br>Room: {row.get('Room', 'N/A')}<br>Sec: {row.get('Section', 'N/A')}"
-        else: 
-            cell_content += f"<br>{row.get('Section', 'N/A')}<br>{row.get('Instructor', 'N/A')[:30]}<br>{row.get('Room', 'N/A')}"
-        
-        cell_content += '</div>'
+    table.schedule_table td:first-child {
+        background: #f8f9fa; color: #2E86AB; font-weight: 600;
+        position: sticky; left: 0; z-index: 5;
+    }
 
-        if day in timetable.columns and display_time_slot_for_index in timetable.index:
-            if timetable.loc[display_time_slot_for_index, day] == '':
-                timetable.loc[display_time_slot_for_index, day] = cell_content
-            else:
-                timetable.loc[display_time_slot_for_index, day] += f'<div style="margin-top: 4px;">{cell_content}</div>'
+    table.schedule_table td { background: #fafafa; transition: background 0.3s; }
+    table.schedule_table td:hover { background: #f0f0f0; }
+</style>
+"""
 
-    return timetable
+def render_timetable_html(schedule_df, entity_type=None, selected_entity=None, subject_colors=None):
+    """Styled HTML for the on-screen timetable, or None when the grid is empty."""
+    timetable_grid_df = create_timetable_grid(schedule_df, entity_type, selected_entity, subject_colors)
+    if timetable_grid_df.empty:
+        return None
+    html_table = timetable_grid_df.to_html(
+        escape=False,
+        na_rep="",
+        classes="schedule_table",
+        index=True,
+        index_names=False,
+        border=0
+    )
+    return TIMETABLE_TABLE_CSS + html_table
 
 
 
@@ -642,8 +448,32 @@ if 'parsed_rooms' not in st.session_state: st.session_state.parsed_rooms = None
 if 'classes_to_be_scheduled' not in st.session_state: st.session_state.classes_to_be_scheduled = None
 if 'generated_schedule_df' not in st.session_state: st.session_state.generated_schedule_df = None
 if 'conflicts' not in st.session_state: st.session_state.conflicts = []
+if 'scheduling_index' not in st.session_state: st.session_state.scheduling_index = None
+if 'phase_timings' not in st.session_state: st.session_state.phase_timings = []
+if 'upload_digests' not in st.session_state: st.session_state.upload_digests = {}
+if 'manual_fix_history' not in st.session_state: st.session_state.manual_fix_history = []
+if 'snapshot_bytes' not in st.session_state: st.session_state.snapshot_bytes = None
+if 'schedule_version' not in st.session_state: st.session_state.schedule_version = 0
+if 'render_cache' not in st.session_state: st.session_state.render_cache = RenderCache()
+if 'bulk_export' not in st.session_state: st.session_state.bulk_export = None  # (schedule_version, zip bytes)
+if 'subject_colors' not in st.session_state: st.session_state.subject_colors = None  # (schedule_version, SubjectColorMap)
+if 'log_next_render' not in st.session_state: st.session_state.log_next_render = False
+if 'last_profile' not in st.session_state: st.session_state.last_profile = None
 # --- End of Session State Initialization ---
 
+# --- Profiling toggle: sidebar, or ?profile=generate / ?profile=render in the URL ---
+PROFILE_TARGETS = {"Off": None, "Schedule generation": "generate", "Timetable render": "render"}
+profile_query = st.query_params.get("profile", "")
+st.sidebar.markdown("### 🧪 Diagnostics")
+profile_target = PROFILE_TARGETS[st.sidebar.selectbox(
+    "cProfile capture",
+    list(PROFILE_TARGETS),
+    index=list(PROFILE_TARGETS.values()).index(profile_query) if profile_query in PROFILE_TARGETS.values() else 0,
+    key="profile_target",
+    help="Profile the next schedule generation or timetable render; the .prof file and a "
+         "cumulative-time table are offered for download below."
+)]
+
 
 # --- Define Tabs (Adding a new first tab) ---
 tab_about, tab_upload, tab_run, tab_schedule, tab_conflicts = st.tabs([
@@ -799,22 +629,44 @@ with tab_upload:
 
     # Load data button
     if st.button("🔄 Load All Uploaded Files", type="primary", use_container_width=True):
-        load_all_data_from_session_uploads()
+        upload_recorder = PhaseRecorder(trace_memory=st.session_state.get('trace_phase_memory', True))
+        parse_cache = default_parse_cache()
+        upload_digests = st.session_state.upload_digests
+        with upload_recorder.phase('read_csv'):
+            load_all_data_from_session_uploads()
         
         # Process data if loaded
         if st.session_state.data_loaded_flags.get('instructors_raw', False) and \
            st.session_state.instructors_raw_df is not None and \
            st.session_state.parsed_instructors is None:
-            st.session_state.parsed_instructors = process_instructor_data(st.session_state.instructors_raw_df)
+            with upload_recorder.phase('process_instructor_data'):
+                st.session_state.parsed_instructors, _ = parse_cache.derived(
+                    'parsed_instructors', [upload_digests.get('instructors_raw')],
+                    lambda: process_instructor_data(st.session_state.instructors_raw_df)
+                )
+            st.session_state.scheduling_index = None
             if st.session_state.parsed_instructors is not None: 
                 st.info("✅ Instructor data processed successfully!")
 
         if st.session_state.data_loaded_flags.get('rooms_raw', False) and \
            st.session_state.rooms_raw_df is not None and \
            st.session_state.parsed_rooms is None:
-            st.session_state.parsed_rooms = process_room_data(st.session_state.rooms_raw_df)
+            with upload_recorder.phase('process_room_data'):
+                st.session_state.parsed_rooms, _ = parse_cache.derived(
+                    'parsed_rooms', [upload_digests.get('rooms_raw')],
+                    lambda: process_room_data(st.session_state.rooms_raw_df)
+                )
+            st.session_state.scheduling_index = None
             if st.session_state.parsed_rooms is not None: 
                 st.info("✅ Room data processed successfully!")
+
+        # Specialization/capacity index, kept after the uploads are cleared
+        # so the Resolve Conflicts dropdowns can still use it
+        if st.session_state.scheduling_index is None:
+            with upload_recorder.phase('build_scheduling_index'):
+                st.session_state.scheduling_index = build_scheduling_index(
+                    st.session_state.parsed_instructors, st.session_state.parsed_rooms
+                )
         
         # Generate list of classes
         all_input_dfs_for_class_list_loaded = (
@@ -823,12 +675,61 @@ with tab_upload:
             st.session_state.curriculum_df is not None
         )
         if all_input_dfs_for_class_list_loaded and st.session_state.classes_to_be_scheduled is None:
-            st.session_state.classes_to_be_scheduled = get_classes_to_schedule(
-                st.session_state.sections_df, st.session_state.subjects_df, st.session_state.curriculum_df
-            )
+            with upload_recorder.phase('get_classes_to_schedule'):
+                # Warnings are cached with the class list so a cache hit still shows them
+                def expand_classes():
+                    class_warnings = []
+                    classes = get_classes_to_schedule(
+                        st.session_state.sections_df, st.session_state.subjects_df, st.session_state.curriculum_df,
+                        on_warning=class_warnings.append
+                    )
+                    return classes, class_warnings
+                (st.session_state.classes_to_be_scheduled, class_warnings), _ = parse_cache.derived(
+                    'classes_to_be_scheduled',
+                    [upload_digests.get(table) for table in ('sections', 'subjects', 'curriculum')],
+                    expand_classes
+                )
+            for message in class_warnings:
+                st.warning(message)
             if st.session_state.classes_to_be_scheduled: 
                 st.success(f"✅ {len(st.session_state.classes_to_be_scheduled)} class instances identified and ready for scheduling!")
 
+        # Data-preparation phases; the Run tab adds its own after these
+        st.session_state.phase_timings = upload_recorder.phases
+
+    # Project snapshot: the whole session in one file, restorable after a refresh
+    with st.expander("💾 Project Snapshot (save or restore the whole session)", expanded=False):
+        st.caption("Saves the five inputs, the class list, the generated schedule, conflicts and manual fixes "
+                   f"as one compressed .{SNAPSHOT_EXTENSION} file (Arrow columnar format).")
+        snapshot_cols = st.columns(2)
+        with snapshot_cols[0]:
+            if st.button("📦 Prepare Snapshot", use_container_width=True,
+                         disabled=st.session_state.sections_df is None and st.session_state.generated_schedule_df is None):
+                try:
+                    st.session_state.snapshot_bytes = build_project_snapshot()
+                except ImportError as e:
+                    st.error(str(e))
+            if st.session_state.snapshot_bytes is not None:
+                st.download_button(
+                    label=f"📥 Download Snapshot ({len(st.session_state.snapshot_bytes) / 1024:.0f} KB)",
+                    data=st.session_state.snapshot_bytes,
+                    file_name=f"insync_project_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{SNAPSHOT_EXTENSION}",
+                    mime="application/zip",
+                    use_container_width=True,
+                    key="snapshot_download"
+                )
+        with snapshot_cols[1]:
+            snapshot_file = st.file_uploader("Restore a snapshot", type=SNAPSHOT_EXTENSION, key="snapshot_upload")
+            if snapshot_file is not None and st.button("♻️ Restore Snapshot", use_container_width=True):
+                try:
+                    snapshot = load_snapshot(snapshot_file.getvalue())
+                except (ImportError, ValueError) as e:
+                    st.error(f"❌ Could not restore snapshot: {e}")
+                else:
+                    restore_project_snapshot(snapshot)
+                    st.session_state.snapshot_bytes = None
+                    st.success(f"✅ Restored the project saved at {snapshot.created_at}.")
+
     st.markdown("---")
     
     # Data Verification Section
@@ -885,6 +786,68 @@ with tab_run:
         st.warning("⚠️ Please ensure all data is uploaded and processed in the Upload tab before running the scheduler.")
     else:
         st.success(f"✅ Ready to schedule {len(st.session_state.classes_to_be_scheduled)} class instances!")
+
+    selected_engine_label = st.selectbox(
+        "⚙️ Scheduling Engine:",
+        list(SCHEDULER_ENGINES),
+        key="scheduler_engine",
+        help="Both greedy engines place classes identically; the bitset engine is faster on large datasets. "
+             "Backtracking revisits earlier choices to place more classes, within a search budget. "
+             "Multi-start runs shuffled greedy variants on all CPU cores and keeps the best one. "
+             "Two-phase picks time slots first, then instructors and rooms per slot; it scales best with many sections. "
+             "Exact MILP proves the most classes that can be placed, but only scales to a department or two."
+    )
+    selected_engine = SCHEDULER_ENGINES[selected_engine_label]
+
+    solver_options = {}
+    if selected_engine == "backtracking":
+        budget_cols = st.columns(2)
+        with budget_cols[0]:
+            solver_options['node_limit'] = int(st.number_input(
+                "Search node budget:", min_value=1000, value=DEFAULT_NODE_LIMIT, step=10000,
+                key="backtracking_node_limit"
+            ))
+        with budget_cols[1]:
+            solver_options['time_limit'] = float(st.number_input(
+                "Time limit (seconds):", min_value=1.0, value=DEFAULT_TIME_LIMIT, step=5.0,
+                key="backtracking_time_limit"
+            ))
+    elif selected_engine == "multistart":
+        solver_options['n_starts'] = int(st.number_input(
+            "Number of randomized starts:", min_value=1, value=DEFAULT_STARTS, step=1,
+            key="multistart_n_starts"
+        ))
+    elif selected_engine == "milp":
+        milp_cols = st.columns(2)
+        with milp_cols[0]:
+            solver_options['time_limit'] = float(st.number_input(
+                "Time limit (seconds):", min_value=1.0, value=MILP_DEFAULT_TIME_LIMIT, step=10.0,
+                key="milp_time_limit"
+            ))
+        with milp_cols[1]:
+            solver_options['mip_rel_gap'] = float(st.number_input(
+                "Acceptable optimality gap (%):", min_value=0.0, max_value=100.0, value=0.0, step=1.0,
+                key="milp_gap_percent"
+            )) / 100
+
+    anneal_time_limit = None
+    if st.checkbox("🔥 Improve with simulated annealing after placement", key="anneal_after_solve",
+                   help="Relocates, swaps and ejects placed classes to fit in the ones left unscheduled."):
+        anneal_time_limit = float(st.number_input(
+            "Annealing time limit (seconds):", min_value=0.5, value=ANNEAL_DEFAULT_TIME_LIMIT, step=1.0,
+            key="anneal_time_limit"
+        ))
+    optimize_rooms = st.checkbox(
+        "🏫 Re-optimize room assignment per time slot", key="optimize_rooms",
+        help="Gives each class the smallest room that seats it within its time slot, "
+             "then uses the freed rooms to place unscheduled classes."
+    )
+    use_result_cache = st.checkbox(
+        "⚡ Reuse a cached schedule for identical data and settings", value=True, key="use_result_cache",
+        help="Results are cached on the server by a hash of the five uploaded files and the settings above, "
+             "so any staff member re-running the same term gets the schedule instantly. "
+             "Untick to force a fresh run (e.g. for another randomized multi-start result)."
+    )
     
     col1, col2, col3 = st.columns([1, 2, 1])
     
@@ -894,15 +857,71 @@ with tab_run:
                      type="primary", 
                      use_container_width=True):
             
-            with st.spinner("🔄 Generating optimal schedule... This may take a moment."):
-                schedule_result, conflicts_result = generate_schedule_attempt(
-                    st.session_state.classes_to_be_scheduled,
-                    st.session_state.parsed_instructors,
-                    st.session_state.parsed_rooms
-                )
+            solver_stats = {}
+            run_recorder = PhaseRecorder(
+                trace_memory=st.session_state.get('trace_phase_memory', True),
+                phases=[p for p in st.session_state.phase_timings if 'stage' not in p]
+            )
+            n_upload_phases = len(run_recorder.phases)
+            result_cache = default_result_cache()
+            cache_key = result_cache_key(
+                [st.session_state.get(key) for key in
+                 ('sections_df', 'instructors_raw_df', 'subjects_df', 'rooms_raw_df', 'curriculum_df')],
+                {'engine': selected_engine, 'solver_options': solver_options,
+                 'anneal_time_limit': anneal_time_limit, 'optimize_rooms': optimize_rooms}
+            )
+            with run_recorder.phase('result_cache_lookup'):
+                # A profiled run always generates, so the capture never shows a cache hit
+                cached_result = (result_cache.get(cache_key)
+                                 if use_result_cache and profile_target != "generate" else None)
+            if cached_result is not None:
+                schedule_result = cached_result['schedule']
+                conflicts_result = cached_result['conflicts']
+                solver_stats = cached_result['solver_stats']
+            else:
+                with st.spinner("🔄 Generating optimal schedule... This may take a moment."), \
+                        run_recorder.phase('generate_schedule_attempt'), \
+                        profiled('generate', enabled=profile_target == "generate") as generation_profile:
+                    try:
+                        schedule_result, conflicts_result = generate_schedule_attempt(
+                            st.session_state.classes_to_be_scheduled,
+                            st.session_state.parsed_instructors,
+                            st.session_state.parsed_rooms,
+                            engine=selected_engine,
+                            index=st.session_state.scheduling_index,
+                            solver_options=solver_options,
+                            solver_stats=solver_stats,
+                            anneal_time_limit=anneal_time_limit,
+                            optimize_rooms=optimize_rooms,
+                            on_warning=st.warning
+                        )
+                    except (ImportError, ModelTooLargeError) as e:
+                        st.error(str(e))
+                        schedule_result, conflicts_result = [], []
+                if generation_profile.prof_bytes is not None:
+                    st.session_state.last_profile = generation_profile
+                if schedule_result:
+                    result_cache.put(cache_key, {'schedule': schedule_result, 'conflicts': conflicts_result,
+                                                 'solver_stats': solver_stats})
             
-            st.session_state.generated_schedule_df = pd.DataFrame(schedule_result)
+            with run_recorder.phase('build_schedule_dataframe'):
+                st.session_state.generated_schedule_df = encode_frame(pd.DataFrame(schedule_result), 'schedule')
             st.session_state.conflicts = conflicts_result
+            st.session_state.manual_fix_history = []
+            bump_schedule_version()
+
+            for record in run_recorder.phases[n_upload_phases:]:
+                record.setdefault('stage', 'run')
+            st.session_state.phase_timings = run_recorder.phases
+            st.session_state.log_next_render = True
+            append_run_log({
+                'kind': 'run',
+                'engine': selected_engine,
+                'cache': 'hit' if cached_result is not None else 'miss',
+                'classes': len(st.session_state.classes_to_be_scheduled or []),
+                'scheduled': len(schedule_result),
+                'phases': run_recorder.phases,
+            })
             
             # Clear uploaded files after successful generation
             clear_uploaded_files()
@@ -925,11 +944,69 @@ with tab_run:
                         st.metric("Success Rate", "N/A")
                 with summary_cols[3]:
                     st.metric("Unscheduled Classes", len([c for c in st.session_state.conflicts if c['type'] == 'Unscheduled Class']))
+
+                if cached_result is not None:
+                    st.info("⚡ Result cache hit: same data and settings as an earlier run, schedule loaded from cache.")
+                elif cache_key is not None:
+                    st.caption("Result cache miss: schedule generated and stored for identical future runs.")
+
+                if selected_engine == "backtracking":
+                    if solver_stats.get('budget_exhausted'):
+                        st.info(f"⏱️ Search budget reached after {solver_stats['nodes']:,} nodes "
+                                f"({solver_stats['solve_time']:.1f}s). Showing the best schedule found"
+                                + (f"; the greedy it started from placed {solver_stats['greedy_placed']} classes."
+                                   if 'greedy_placed' in solver_stats else "."))
+                    else:
+                        st.info(f"🏁 Search completed in {solver_stats['nodes']:,} nodes "
+                                f"({solver_stats['solve_time']:.1f}s). No schedule places more classes.")
+                elif selected_engine == "multistart":
+                    best_label = "deterministic greedy" if solver_stats['best_seed'] is None else f"seed {solver_stats['best_seed']}"
+                    st.info(f"🎲 Best of {solver_stats['starts']} starts on {solver_stats['workers']} worker(s) "
+                            f"({solver_stats['solve_time']:.1f}s): {best_label}, unscheduled per start "
+                            f"{min(solver_stats['unscheduled_per_start'])}–{max(solver_stats['unscheduled_per_start'])}.")
+                elif selected_engine == "decomposition":
+                    st.info(f"🧩 Slot coloring used {solver_stats['cells_used']} time slot(s) in {solver_stats['rounds']} "
+                            f"round(s): coloring {solver_stats['coloring_time']:.2f}s, "
+                            f"matching {solver_stats['matching_time']:.2f}s.")
+                elif selected_engine == "milp":
+                    gap_label = "n/a" if solver_stats['gap'] is None else f"{solver_stats['gap']:.1%}"
+                    bound_label = "unknown" if solver_stats['upper_bound'] is None else solver_stats['upper_bound']
+                    st.info(f"📐 MILP over {solver_stats['variables']:,} variables and {solver_stats['constraints']:,} "
+                            f"constraints: optimality gap {gap_label}, at most {bound_label} "
+                            f"class(es) can be placed. Built in {solver_stats['build_time']:.2f}s, "
+                            f"solved in {solver_stats['solve_time']:.1f}s ({solver_stats['status']}).")
+                if 'annealing' in solver_stats:
+                    anneal_stats = solver_stats['annealing']
+                    placed_more = anneal_stats['unscheduled_before'] - anneal_stats['unscheduled_after']
+                    st.info(f"🔥 Annealing placed {placed_more} more class(es) in {anneal_stats['iterations']:,} moves "
+                            f"({anneal_stats['solve_time']:.1f}s).")
+                if 'rooms' in solver_stats:
+                    room_stats = solver_stats['rooms']
+                    st.info(f"🏫 Room re-assignment removed {room_stats['wasted_seats_removed']:,} wasted seat(s) "
+                            f"({room_stats['wasted_seats_before']:,} → {room_stats['wasted_seats_after']:,}) and placed "
+                            f"{room_stats['classes_placed']} more class(es) ({room_stats['solve_time']:.2f}s).")
                 
                 st.info("📄 Uploaded files have been cleared. You can now view and export the generated schedule.")
             else:
                 st.error("❌ No classes could be scheduled. Please check your input data and try again.")
 
+    with st.expander("⏱️ Phase timings (wall, CPU, peak memory)", expanded=False):
+        st.checkbox(
+            "Record peak memory per phase (tracemalloc; makes runs slower)", value=True, key="trace_phase_memory"
+        )
+        if st.session_state.phase_timings:
+            timings_df = pd.DataFrame(st.session_state.phase_timings)
+            timings_df = timings_df[[c for c in ('phase', 'wall_s', 'cpu_s', 'peak_mb') if c in timings_df.columns]]
+            st.dataframe(
+                timings_df.rename(columns={'phase': 'Phase', 'wall_s': 'Wall (s)', 'cpu_s': 'CPU (s)',
+                                           'peak_mb': 'Peak alloc (MB)'}),
+                hide_index=True, use_container_width=True
+            )
+            st.caption(f"Total wall time {sum(p['wall_s'] for p in st.session_state.phase_timings):.2f}s. "
+                       "Each run is appended to the JSONL run log on the server.")
+        else:
+            st.caption("Load data and generate a schedule to see per-phase timings.")
+
 # --- Tab 3: View Generated Schedule ---
 # In Tab 3, replace the export section with this:
 with tab_schedule:
@@ -973,22 +1050,12 @@ with tab_schedule:
         with export_cols[2]:
             # Export filtered timetable
             if st.button("🖨️ Export for Print", use_container_width=True):
-                # Get the current timetable grid (already filtered)
-                timetable_grid = create_timetable_grid(
+                # Plain-text cells built straight from the current (filtered) timetable data
+                print_timetable = render_text_grid(build_timetable(
                     st.session_state.generated_schedule_df,
                     current_filter_type if current_filter_type != "Overall View" else None,
                     current_entity if current_entity != "All" else None
-                )
-                
-                # Convert timetable grid to a more print-friendly format
-                # Remove HTML tags for CSV export
-                print_timetable = timetable_grid.copy()
-                
-                # Clean HTML from cells
-                for col in print_timetable.columns:
-                    print_timetable[col] = print_timetable[col].apply(
-                        lambda x: clean_html_for_export(x) if x else ''
-                    )
+                ))
                 
                 # Add metadata header
                 metadata_rows = []
@@ -1033,6 +1100,34 @@ with tab_schedule:
             st.info(f"📌 **Export Info:** Currently viewing and exporting schedule for {current_filter_type}: **{current_entity}**")
         else:
             st.info("📌 **Export Info:** Currently viewing and exporting the complete schedule")
+
+        # Every section, instructor and room timetable in one archive, rendered on a thread pool
+        with st.expander("🗂️ Bulk Export (all sections, instructors and rooms)"):
+            st.caption("One CSV and one printable HTML timetable per section, instructor and room, "
+                       "plus the complete schedule CSV, in a single ZIP.")
+            if st.button("📦 Build ZIP", key="bulk_export_build", use_container_width=True):
+                with st.spinner("Rendering timetables..."):
+                    subject_colors = current_subject_colors()
+                    zip_bytes, bulk_stats = build_timetable_zip(
+                        st.session_state.generated_schedule_df,
+                        lambda entity_type, entity, rows: render_entity_exports(
+                            entity_type, entity, rows, subject_colors),
+                        extra_files={'schedule.csv': export_schedule_to_csv(st.session_state.generated_schedule_df)}
+                    )
+                st.session_state.bulk_export = (st.session_state.schedule_version, zip_bytes)
+                st.success(f"✅ {bulk_stats['entities']} timetables ({bulk_stats['files']} files) rendered "
+                           f"on {bulk_stats['workers']} worker(s) in {bulk_stats['elapsed_s']:.1f}s")
+            # An archive built before the latest run or manual fix is stale
+            if st.session_state.bulk_export is not None and \
+                    st.session_state.bulk_export[0] == st.session_state.schedule_version:
+                st.download_button(
+                    label="⬇️ Download All Timetables (ZIP)",
+                    data=st.session_state.bulk_export[1],
+                    file_name=f"timetables_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                    mime="application/zip",
+                    use_container_width=True,
+                    key="bulk_export_download"
+                )
         
         # Filter Options in Sidebar
         st.sidebar.markdown("### 🔍 Schedule Filters")
@@ -1065,86 +1160,44 @@ with tab_schedule:
             )
 
         # Display Schedule
-        schedule_to_display = st.session_state.generated_schedule_df.copy()
-        
-        if 'Day' in schedule_to_display.columns:
-            schedule_to_display['Day'] = schedule_to_display['Day'].astype(str).str.upper()
+        # create_timetable_grid neither mutates its input nor needs upper-cased days
+        schedule_to_display = st.session_state.generated_schedule_df
 
         if selected_filter_type == "Overall View":
             st.subheader("📋 Master Schedule Overview")
-            timetable_grid_df = create_timetable_grid(schedule_to_display, None, None)
+            grid_filter = (None, None)
         elif selected_entity and selected_entity != "All":
             st.subheader(f"📅 Schedule for {selected_filter_type}: **{selected_entity}**")
-            timetable_grid_df = create_timetable_grid(schedule_to_display, selected_filter_type, selected_entity)
+            grid_filter = (selected_filter_type, selected_entity)
         else:
             st.info(f"Displaying combined schedule for all {selected_filter_type}s.")
-            timetable_grid_df = create_timetable_grid(schedule_to_display, None, None)
-
-        if not timetable_grid_df.empty:
-            html_table = timetable_grid_df.to_html(
-                escape=False,
-                na_rep="",
-                classes="schedule_table",
-                index=True,
-                index_names=False,
-                border=0
-            )
-
-            enhanced_table_css = """
-            <style>
-                /* 1️⃣  --- container that locks the overall size --- */
-                .timetable_box {
-                    width: 900px;      /*  ⬅️  pick any width  */
-                    height: 520px;     /*  ⬅️  pick any height */
-                    overflow: auto;    /*  scrollbars when content overflows */
-                    margin: 0 auto;    /*  center horizontally (optional) */
-                }
-
-                /* 2️⃣  --- fix the table geometry --- */
-                table.schedule_table {
-                    table-layout: fixed;   /* cells obey the width rule below   */
-                    width: 100%;           /* stretches to the .timetable_box   */
-                    height: 100%;          /* ditto                              */
-                    border-collapse: collapse;
-                    background: #fff;
-                    border-radius: 10px;
-                    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                }
-
-                /* 3️⃣  --- cap individual cell sizes --- */
-                table.schedule_table th,
-                table.schedule_table td {
-                    width: 120px;      /*  fixed column width    */
-                    height: 80px;      /*  fixed row height      */
-                    white-space: nowrap;
-                    overflow: hidden;
-                    text-overflow: ellipsis;
-                    border: 1px solid #e0e0e0;
-                    padding: 8px;
-                    text-align: center;
-                    vertical-align: middle;
-                    font-size: 0.85em;
-                }
-
-                /* existing colours & sticky headers … */
-                table.schedule_table th {
-                    background: #2E86AB; color: #fff; font-weight: 600;
-                    text-transform: uppercase; letter-spacing: 0.5px;
-                    position: sticky; top: 0; z-index: 10;
-                }
-
-                table.schedule_table td:first-child {
-                    background: #f8f9fa; color: #2E86AB; font-weight: 600;
-                    position: sticky; left: 0; z-index: 5;
-                }
-
-                table.schedule_table td { background: #fafafa; transition: background 0.3s; }
-                table.schedule_table td:hover { background: #f0f0f0; }
-            </style>
-            """
-            
-            st.markdown(enhanced_table_css, unsafe_allow_html=True)
-            st.markdown(html_table, unsafe_allow_html=True)
+            grid_filter = (None, None)
+
+        # Rendered HTML is cached per (schedule version, filter, entity); flipping between
+        # views of an unchanged schedule is a lookup. A profiled render always rebuilds.
+        render_recorder = PhaseRecorder(trace_memory=st.session_state.get('trace_phase_memory', True))
+        with render_recorder.phase('render_timetable'), \
+                profiled('render', enabled=profile_target == "render") as render_profile:
+            if profile_target == "render":
+                timetable_html, render_cache_hit = render_timetable_html(
+                    schedule_to_display, *grid_filter, current_subject_colors()), False
+            else:
+                timetable_html, render_cache_hit = st.session_state.render_cache.get_or_render(
+                    st.session_state.schedule_version, grid_filter,
+                    lambda: render_timetable_html(schedule_to_display, *grid_filter, current_subject_colors())
+                )
+        # Keep only the latest render next to the run phases; log the first render after each run
+        if render_profile.prof_bytes is not None:
+            st.session_state.last_profile = render_profile
+        render_record = dict(render_recorder.phases[0], stage='render', cache='hit' if render_cache_hit else 'miss')
+        st.session_state.phase_timings = [
+            p for p in st.session_state.phase_timings if p.get('stage') != 'render'] + [render_record]
+        if st.session_state.log_next_render:
+            append_run_log({'kind': 'render', 'filter': selected_filter_type, 'phases': [render_record]})
+            st.session_state.log_next_render = False
+
+        if timetable_html is not None:
+            st.markdown(timetable_html, unsafe_allow_html=True)
             
             # Display raw data option
             with st.expander("📊 View Raw Schedule Data"):
@@ -1193,11 +1246,12 @@ with tab_conflicts:
                    "suitable combination found" in c.get('reason', '').lower():
                     conflict_options.append(display_str)
                     resolvable_conflict_details.append({'display': display_str, 'original_index': idx, 'type': c['type']})
-            elif c['type'] == 'Teacher Double Booked (Post-Check)':
-                display_str += f"Teacher: {c.get('instructor', 'N/A')} at {c.get('day','N/A')} {c.get('time_slot','N/A')}"
+            elif c['type'] in DOUBLE_BOOKING_LABELS:
+                # Teacher, Room or Section: all resolved by moving one of the classes involved
+                label, key = DOUBLE_BOOKING_LABELS[c['type']]
+                display_str += f"{label}: {c.get(key, 'N/A')} at {c.get('day','N/A')} {c.get('time_slot','N/A')}"
                 conflict_options.append(display_str)
                 resolvable_conflict_details.append({'display': display_str, 'original_index': idx, 'type': c['type']})
-            # Add elif for 'Room Double Booked (Post-Check)' later
 
         selected_conflict_display_str_main = st.selectbox(
             "Choose a conflict:",
@@ -1211,8 +1265,8 @@ with tab_conflicts:
                 if item['display'] == selected_conflict_display_str_main:
                     st.session_state.selected_conflict_to_resolve_idx = item['original_index']
                     st.session_state.selected_conflict_type = item['type']
-                    # Reset sub-selection for teacher double booking if a new conflict is chosen
-                    if st.session_state.selected_conflict_type != 'Teacher Double Booked (Post-Check)':
+                    # Reset sub-selection for double bookings if a new conflict is chosen
+                    if st.session_state.selected_conflict_type not in DOUBLE_BOOKING_LABELS:
                         st.session_state.class_to_modify_from_double_booking_idx = None
                     break
         else:
@@ -1241,13 +1295,13 @@ with tab_conflicts:
                         # (Your selectboxes for selected_teacher, selected_room, selected_day, selected_time_slot)
                         # ...
                         sel_teacher_options = ["Select..."] 
-                        if st.session_state.get('parsed_instructors'): # Use .get for safety
-                            sel_teacher_options.extend(sorted([name for name, details in st.session_state['parsed_instructors'].items() if conflict_to_resolve['required_specialization'] in details['specializations']]))
+                        if st.session_state.get('scheduling_index') is not None: # Use .get for safety
+                            sel_teacher_options.extend(sorted(st.session_state.scheduling_index.specialized_instructors(conflict_to_resolve['required_specialization'])))
                         selected_teacher = st.selectbox("Select Teacher:", sel_teacher_options, key=f"uns_teacher_{conflict_original_idx}")
                         
                         sel_room_options = ["Select..."]
-                        if st.session_state.get('parsed_rooms'):
-                            sel_room_options.extend(sorted([name for name, room_slots in st.session_state['parsed_rooms'].items() if any(details['capacity'] >= conflict_to_resolve['students'] for details in room_slots.values())]))
+                        if st.session_state.get('scheduling_index') is not None:
+                            sel_room_options.extend(sorted(st.session_state.scheduling_index.rooms_with_capacity(conflict_to_resolve['students'])))
                         selected_room = st.selectbox("Select Room:", sel_room_options, key=f"uns_room_{conflict_original_idx}")
 
                         selected_day = st.selectbox("Select Day:", ["Select..."] + DAYS_ORDER, key=f"uns_day_{conflict_original_idx}")
@@ -1295,17 +1349,18 @@ with tab_conflicts:
 
                                 # Add directly to the schedule
                                 if st.session_state.get('generated_schedule_df') is None:
-                                    st.session_state.generated_schedule_df = pd.DataFrame([forced_class_details])
+                                    st.session_state.generated_schedule_df = encode_frame(pd.DataFrame([forced_class_details]), 'schedule')
                                 else:
                                     new_row_df = pd.DataFrame([forced_class_details])
-                                    st.session_state.generated_schedule_df = pd.concat(
+                                    st.session_state.generated_schedule_df = encode_frame(pd.concat(
                                         [st.session_state.generated_schedule_df, new_row_df], 
                                         ignore_index=True
-                                    )
+                                    ), 'schedule')
                                 
                                 # Remove the resolved "Unscheduled Class" conflict from the list
                                 st.session_state.conflicts.pop(conflict_original_idx) 
                                                                     
+                                record_manual_fix('Force assign', forced_class_details)
                                 feedback_msg = (f"FORCE ASSIGNED: {forced_class_details['Subject Code']} "
                                                 f"for {forced_class_details['Section']} to {forced_class_details['Instructor']} "
                                                 f"in {forced_class_details['Room']} at {forced_class_details['Day']} {forced_class_details['Time Slot']}.\n"
@@ -1319,21 +1374,20 @@ with tab_conflicts:
                                 st.session_state.selected_conflict_type = None
                                 st.rerun() 
 
-                # --- B. Resolver for "Teacher Double Booked" ---
-                elif st.session_state.selected_conflict_type == 'Teacher Double Booked (Post-Check)':
-                    st.markdown(f"**Resolving Teacher Double Booking (Conflict Orig.Idx: {conflict_original_idx}):**\n"
-                                f"- Teacher: **{conflict_to_resolve['instructor']}**\n"
+                # --- B. Resolver for Teacher, Room and Section Double Bookings ---
+                elif st.session_state.selected_conflict_type in DOUBLE_BOOKING_LABELS:
+                    booked_label, booked_key = DOUBLE_BOOKING_LABELS[st.session_state.selected_conflict_type]
+                    st.markdown(f"**Resolving {conflict_to_resolve['type']} (Conflict Orig.Idx: {conflict_original_idx}):**\n"
+                                f"- {booked_label}: **{conflict_to_resolve[booked_key]}**\n"
                                 f"- Day: **{conflict_to_resolve['day']}**, Time: **{conflict_to_resolve['time_slot']}**\n"
                                 f"- Classes Involved: **{conflict_to_resolve['classes_involved']}**")
                     
                     # Find the actual class entries in generated_schedule_df that are conflicting
                     conflicting_schedule_entries = []
                     if st.session_state.generated_schedule_df is not None:
-                        conflicting_schedule_entries = st.session_state.generated_schedule_df[
-                            (st.session_state.generated_schedule_df['Instructor'] == conflict_to_resolve['instructor']) &
-                            (st.session_state.generated_schedule_df['Day'].str.upper() == conflict_to_resolve['day'].upper()) & # Ensure case consistency
-                            (st.session_state.generated_schedule_df['Time Slot'] == conflict_to_resolve['time_slot'])
-                        ].copy() # Use .copy()
+                        conflicting_schedule_entries = double_booking_rows(
+                            st.session_state.generated_schedule_df, conflict_to_resolve
+                        ).copy() # Use .copy()
                         # Add an original DataFrame index to each entry for easy reference
                         conflicting_schedule_entries['original_df_index'] = conflicting_schedule_entries.index 
                     
@@ -1373,15 +1427,15 @@ with tab_conflicts:
                                 required_spec_for_class = st.session_state.subjects_df[st.session_state.subjects_df['Subject Code'] == class_to_modify_details['Subject Code']]['Required Specialization'].iloc[0]
                                 
                                 tdb_teacher_options = ["Keep Original Teacher"] + sorted([
-                                    name for name, details in st.session_state.parsed_instructors.items() 
-                                    if required_spec_for_class in details['specializations'] and name != class_to_modify_details['Instructor'] # Exclude current teacher if changing
+                                    name for name in st.session_state.scheduling_index.specialized_instructors(required_spec_for_class)
+                                    if name != class_to_modify_details['Instructor'] # Exclude current teacher if changing
                                 ])
                                 new_teacher = st.selectbox("New Teacher (Optional):", tdb_teacher_options, key=f"tdb_teacher_{conflict_original_idx}")
 
                                 # Get Suitable Rooms
                                 tdb_room_options = ["Keep Original Room"] + sorted([
-                                    name for name, room_slots in st.session_state.parsed_rooms.items()
-                                    if any(details['capacity'] >= class_to_modify_details['Students'] for details in room_slots.values()) and name != class_to_modify_details['Room']
+                                    name for name in st.session_state.scheduling_index.rooms_with_capacity(class_to_modify_details['Students'])
+                                    if name != class_to_modify_details['Room']
                                 ])
                                 new_room = st.selectbox("New Room (Optional):", tdb_room_options, key=f"tdb_room_{conflict_original_idx}")
                                 
@@ -1428,12 +1482,16 @@ with tab_conflicts:
 
                                         if not new_placement_conflicts:
                                             # Update the original DataFrame at the specific index
-                                            for col, val in modified_class_entry.items():
-                                                st.session_state.generated_schedule_df.loc[st.session_state.class_to_modify_from_double_booking_idx, col] = val
+                                            set_schedule_values(
+                                                st.session_state.generated_schedule_df,
+                                                st.session_state.class_to_modify_from_double_booking_idx,
+                                                modified_class_entry
+                                            )
                                             
-                                            # Remove the original "Teacher Double Booked" conflict
+                                            # Remove the original double-booking conflict
                                             st.session_state.conflicts.pop(conflict_original_idx)
                                             
+                                            record_manual_fix('Move', modified_class_entry)
                                             feedback_msg = (f"SUCCESS: Moved {class_to_modify_details['Subject Code']} for Sec {class_to_modify_details['Section']}. "
                                                             f"New: {final_teacher}, {final_room}, {final_day} {final_time_slot}.")
                                             st.success(feedback_msg)
@@ -1452,10 +1510,6 @@ with tab_conflicts:
                              st.session_state.class_to_modify_from_double_booking_idx = None
 
 
-                # Add stubs for other conflict types later
-                # elif st.session_state.selected_conflict_type == 'Room Double Booked (Post-Check)':
-                #     st.info("Resolution for Room Double Bookings - To be implemented.")
-
         # General feedback display (if any)
         if st.session_state.manual_assignment_feedback and not (submitted_unscheduled_fix or (locals().get('submitted_tdb_fix') and submitted_tdb_fix)):
              st.info(f"Last operation feedback: {st.session_state.manual_assignment_feedback}")
@@ -1464,4 +1518,32 @@ with tab_conflicts:
     elif st.session_state.generated_schedule_df is not None:
         st.success("No conflicts or issues were reported by the scheduler!")
     else:
-        st.info("Scheduler has not been run yet (Tab 2), or no conflicts were generated to resolve.")
\ No newline at end of file
+        st.info("Scheduler has not been run yet (Tab 2), or no conflicts were generated to resolve.")
+
+
+# --- Sidebar: latest cProfile capture (drawn last so it includes this rerun's capture) ---
+if st.session_state.last_profile is not None:
+    last_profile = st.session_state.last_profile
+    with st.sidebar:
+        st.caption(f"Last profile: **{last_profile.label}** at {last_profile.created_at:%H:%M:%S}, "
+                   f"{last_profile.total_time:.2f}s profiled")
+        st.download_button(
+            label="📥 Download .prof",
+            data=last_profile.prof_bytes,
+            file_name=f"{last_profile.file_stem}.prof",
+            mime="application/octet-stream",
+            use_container_width=True,
+            key="profile_prof_download"
+        )
+        profile_top_df = pd.DataFrame(last_profile.top_functions)
+        st.download_button(
+            label=f"📥 Download top {len(profile_top_df)} (CSV)",
+            data=profile_top_df.to_csv(index=False),
+            file_name=f"{last_profile.file_stem}_top.csv",
+            mime="text/csv",
+            use_container_width=True,
+            key="profile_top_download"
+        )
+        with st.expander("Top functions by cumulative time"):
+            st.dataframe(profile_top_df[['function', 'cumtime_s', 'tottime_s', 'calls']],
+                         hide_index=True, use_container_width=True)
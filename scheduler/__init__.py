@@ -0,0 +1 @@
+"""Scheduling engine for Honorians InSync (no Streamlit dependencies)."""
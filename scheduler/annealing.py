@@ -0,0 +1,325 @@
+"""Simulated-annealing improvement pass over a finished schedule."""
+import math
+import random
+import time
+
+from scheduler.indexes import SchedulingIndex
+from scheduler.occupancy import (
+    NO_COMMON_SLOT_REASON, OccupancyGrid, schedule_entry, unscheduled_conflict,
+)
+
+DEFAULT_TIME_LIMIT = 5.0
+START_TEMPERATURE = 0.6
+END_TEMPERATURE = 0.02
+MAX_CHAIN_LENGTH = 5
+SAMPLES_PER_STEP = 12
+
+
+class ScheduleAnnealer:
+    """
+    Local search that tries to place the classes a solver left unscheduled.
+
+    Every state is conflict-free: moves only book free (instructor, room, cell)
+    triples, so the cost is simply the number of unplaced classes and each move
+    reports its delta, an O(1) cost update. Random classes are drawn from
+    indexable lists of the placed and unplaced ids, so picking one is O(1)
+    too; swap and kick are O(1) overall. Relocate and each ejection-chain step
+    also look for a free triple (_free_triple), which ORs the busy masks of the
+    class's eligible rooms and tries its instructors: O(rooms + instructors)
+    bitmask operations for that class. Moves:
+
+    - ejection chain: place an unplaced class at a triple held by at most one
+      other class, evict that class and let it do the same, up to
+      MAX_CHAIN_LENGTH steps (delta -1 if the chain ends on a free triple, else 0)
+    - relocate: move a placed class to another free triple (delta 0)
+    - swap: two placed classes exchange cells, keeping instructor and room (delta 0)
+    - kick: unplace a random class (delta +1), accepted with probability exp(-1/T)
+
+    The temperature falls geometrically over the time limit and the best state
+    seen is restored at the end.
+    """
+
+    def __init__(self, generated_schedule, conflicts, classes_to_schedule, parsed_instructors, parsed_rooms,
+                 index=None, rng=None):
+        if index is None:
+            index = SchedulingIndex(parsed_instructors, parsed_rooms)
+        self.index = index
+        self.rng = rng or random.Random()
+        self.grid = grid = OccupancyGrid(parsed_instructors, parsed_rooms)
+
+        classes_by_key = {}
+        for class_info in classes_to_schedule:
+            key = (class_info['section_name'], class_info['subject_code'])
+            classes_by_key.setdefault(key, []).append(class_info)
+
+        self.classes = []
+        self.placement = {}      # class id -> (instructor, room, cell)
+        self.placed = []         # placed class ids, for O(1) random picks
+        self.placed_pos = {}     # class id -> position in placed
+        self.instructor_at = {}  # (instructor, cell) -> class id
+        self.room_at = {}        # (room, cell) -> class id
+        self.section_at = {}     # (section, cell) -> class id
+
+        # Rows whose class cannot be matched back are passed through untouched,
+        # but still reserve their instructor, room and section
+        self.fixed_rows = []
+        self.row_order = []
+        for row in generated_schedule:
+            matches = classes_by_key.get((row['Section'], row['Subject Code']))
+            if not matches or row['Instructor'] not in grid.instructor_ids or row['Room'] not in grid.room_ids:
+                self.fixed_rows.append(row)
+                self._reserve(row)
+                continue
+            k = self._add_class(matches.pop(0))
+            self.row_order.append(k)
+            self._place(k, (grid.instructor_ids[row['Instructor']], grid.room_ids[row['Room']],
+                            grid.cell_id(row['Day'], row['Time Slot'])))
+
+        self.fixed_conflicts = []
+        self.unplaced = []
+        for conflict in conflicts:
+            matches = classes_by_key.get((conflict.get('section'), conflict.get('subject')))
+            if conflict['type'] != 'Unscheduled Class' or conflict.get('reason') != NO_COMMON_SLOT_REASON \
+                    or not matches:
+                self.fixed_conflicts.append(conflict)
+                continue
+            self.unplaced.append(self._add_class(matches.pop(0)))
+
+        self.cost = len(self.unplaced)
+
+    def _reserve(self, row):
+        grid = self.grid
+        bit = 1 << grid.cell_id(row['Day'], row['Time Slot'])
+        if row['Instructor'] in grid.instructor_ids:
+            grid.instructor_busy[grid.instructor_ids[row['Instructor']]] |= bit
+        if row['Room'] in grid.room_ids:
+            grid.room_busy[grid.room_ids[row['Room']]] |= bit
+        grid.section_busy[grid.section_id(row['Section'])] |= bit
+
+    def _add_class(self, class_info):
+        k = len(self.classes)
+        num_students = class_info['section_students']
+        self.classes.append({
+            'info': class_info,
+            'section': self.grid.section_id(class_info['section_name']),
+            'instructors': self.index.specialized_instructor_ids(class_info['required_specialization']),
+            'rooms': self.index.room_ids_with_capacity(num_students),
+            'fit_masks': self.grid.fit_masks(num_students),
+        })
+        return k
+
+    def _place(self, k, triple):
+        instructor, room, cell = triple
+        section = self.classes[k]['section']
+        self.grid.book(instructor, room, section, cell)
+        self.placement[k] = triple
+        self.placed_pos[k] = len(self.placed)
+        self.placed.append(k)
+        self.instructor_at[(instructor, cell)] = k
+        self.room_at[(room, cell)] = k
+        self.section_at[(section, cell)] = k
+
+    def _unplace(self, k):
+        instructor, room, cell = self.placement.pop(k)
+        section = self.classes[k]['section']
+        # Swap-remove: the last placed id takes k's position
+        pos, last = self.placed_pos.pop(k), self.placed.pop()
+        if last != k:
+            self.placed[pos] = last
+            self.placed_pos[last] = pos
+        self.grid.release(instructor, room, section, cell)
+        del self.instructor_at[(instructor, cell)]
+        del self.room_at[(room, cell)]
+        del self.section_at[(section, cell)]
+
+    def _free_triple(self, k, exclude_cell=None):
+        """A random free (instructor, room, cell) for class k, or None."""
+        grid, info = self.grid, self.classes[k]
+        open_rooms = 0
+        for room in info['rooms']:
+            open_rooms |= info['fit_masks'][room] & ~grid.room_busy[room]
+        open_cells = open_rooms & ~grid.section_busy[info['section']]
+        if exclude_cell is not None:
+            open_cells &= ~(1 << exclude_cell)
+        if not open_cells:
+            return None
+        for instructor in self.rng.sample(info['instructors'], len(info['instructors'])):
+            candidates = grid.instructor_avail[instructor] & ~grid.instructor_busy[instructor] & open_cells
+            if candidates:
+                cells = [c for c in grid.instructor_cells[instructor] if candidates >> c & 1]
+                cell = self.rng.choice(cells)
+                rooms = [r for r in info['rooms']
+                         if (info['fit_masks'][r] & ~grid.room_busy[r]) >> cell & 1]
+                return instructor, self.rng.choice(rooms), cell
+        return None
+
+    def _sample_triple(self, k):
+        """A random statically feasible (instructor, room, cell) for k, ignoring occupancy."""
+        grid, info = self.grid, self.classes[k]
+        instructor = self.rng.choice(info['instructors'])
+        cells = grid.instructor_cells[instructor]
+        if not cells:
+            return None
+        cell = self.rng.choice(cells)
+        rooms = [r for r in info['rooms'] if info['fit_masks'][r] >> cell & 1]
+        if not rooms:
+            return None
+        return instructor, self.rng.choice(rooms), cell
+
+    def _blockers(self, k, triple):
+        instructor, room, cell = triple
+        holders = {
+            self.instructor_at.get((instructor, cell)),
+            self.room_at.get((room, cell)),
+            self.section_at.get((self.classes[k]['section'], cell)),
+        }
+        holders.discard(None)
+        return holders
+
+    def _ejection_chain(self):
+        """Place a random unplaced class, evicting at most one holder per step."""
+        slot = self.rng.randrange(len(self.unplaced))
+        current = self.unplaced[slot]
+        moved = {current}
+        for _ in range(MAX_CHAIN_LENGTH):
+            triple = self._free_triple(current)
+            if triple is not None:
+                self._place(current, triple)
+                self.unplaced[slot] = self.unplaced[-1]
+                self.unplaced.pop()
+                return -1
+            best = None
+            for _ in range(SAMPLES_PER_STEP):
+                candidate = self._sample_triple(current)
+                if candidate is None:
+                    continue
+                blockers = self._blockers(current, candidate)
+                if len(blockers) == 1 and not blockers & moved:
+                    best = (candidate, blockers.pop())
+                    break
+            if best is None:
+                return 0
+            candidate, evicted = best
+            evicted_triple = self.placement[evicted]
+            self._unplace(evicted)
+            if not self._fits(current, candidate):
+                # Still blocked by a reserved row, which has no holder to evict
+                self._place(evicted, evicted_triple)
+                return 0
+            self._place(current, candidate)
+            self.unplaced[slot] = evicted
+            current = evicted
+            moved.add(current)
+        return 0
+
+    def _relocate(self):
+        if not self.placement:
+            return 0
+        k = self.rng.choice(self.placed)
+        old = self.placement[k]
+        self._unplace(k)
+        triple = self._free_triple(k, exclude_cell=old[2])
+        self._place(k, triple or old)
+        return 0
+
+    def _swap(self):
+        if len(self.placement) < 2:
+            return 0
+        a, b = self.rng.sample(self.placed, 2)
+        (ia, ra, ca), (ib, rb, cb) = self.placement[a], self.placement[b]
+        if ca == cb:
+            return 0
+        self._unplace(a)
+        self._unplace(b)
+        new_a, new_b = (ia, ra, cb), (ib, rb, ca)
+        # The two new triples sit in different cells, so they cannot block each other
+        if self._fits(a, new_a) and self._fits(b, new_b):
+            self._place(a, new_a)
+            self._place(b, new_b)
+            return 0
+        self._place(a, (ia, ra, ca))
+        self._place(b, (ib, rb, cb))
+        return 0
+
+    def _fits(self, k, triple):
+        """Static feasibility plus occupancy of a triple for class k."""
+        instructor, room, cell = triple
+        grid, info = self.grid, self.classes[k]
+        bit = 1 << cell
+        return bool(
+            grid.instructor_avail[instructor] & bit
+            and info['fit_masks'][room] & bit
+            and not grid.instructor_busy[instructor] & bit
+            and not grid.room_busy[room] & bit
+            and not grid.section_busy[info['section']] & bit
+        )
+
+    def _kick(self, temperature):
+        if not self.placement or self.rng.random() >= math.exp(-1 / temperature):
+            return 0
+        k = self.rng.choice(self.placed)
+        self._unplace(k)
+        self.unplaced.append(k)
+        return 1
+
+    def run(self, time_limit=DEFAULT_TIME_LIMIT):
+        """
+        Anneal until the time limit or until nothing is left unplaced.
+
+        Returns:
+            tuple: (generated_schedule, conflicts, stats) in the shape the UI consumes.
+        """
+        start = time.perf_counter()
+        initial_cost = best_cost = self.cost
+        best_placement = dict(self.placement)
+        iterations = 0
+
+        while self.cost:
+            elapsed = time.perf_counter() - start
+            if elapsed >= time_limit:
+                break
+            temperature = START_TEMPERATURE * (END_TEMPERATURE / START_TEMPERATURE) ** (elapsed / time_limit)
+            iterations += 1
+
+            move = self.rng.random()
+            if move < 0.5:
+                self.cost += self._ejection_chain()
+            elif move < 0.7:
+                self.cost += self._relocate()
+            elif move < 0.9:
+                self.cost += self._swap()
+            else:
+                self.cost += self._kick(temperature)
+
+            if self.cost < best_cost:
+                best_cost = self.cost
+                best_placement = dict(self.placement)
+
+        generated_schedule = list(self.fixed_rows)
+        conflicts = list(self.fixed_conflicts)
+        originally_placed = set(self.row_order)
+        newly_placed = [k for k in best_placement if k not in originally_placed]
+        for k in self.row_order + sorted(newly_placed):
+            if k in best_placement:
+                instructor, room, cell = best_placement[k]
+                generated_schedule.append(
+                    schedule_entry(self.grid, self.classes[k]['info'], instructor, room, cell))
+        for k, info in enumerate(self.classes):
+            if k not in best_placement:
+                conflicts.append(unscheduled_conflict(info['info'], NO_COMMON_SLOT_REASON))
+
+        stats = {
+            'iterations': iterations,
+            'solve_time': time.perf_counter() - start,
+            'unscheduled_before': initial_cost,
+            'unscheduled_after': best_cost,
+        }
+        return generated_schedule, conflicts, stats
+
+
+def improve_schedule_annealing(generated_schedule, conflicts, classes_to_schedule, parsed_instructors, parsed_rooms,
+                               index=None, time_limit=DEFAULT_TIME_LIMIT, seed=None):
+    """Run ScheduleAnnealer on a solver result; returns (generated_schedule, conflicts, stats)."""
+    annealer = ScheduleAnnealer(generated_schedule, conflicts, classes_to_schedule, parsed_instructors,
+                                parsed_rooms, index, random.Random(seed))
+    return annealer.run(time_limit=time_limit)
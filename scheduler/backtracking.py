@@ -0,0 +1,323 @@
+"""Constraint-propagation backtracking engine (MRV + forward checking, budgeted)."""
+import time
+
+import numpy as np
+
+from scheduler.indexes import SchedulingIndex
+from scheduler.occupancy import (
+    NO_COMMON_SLOT_REASON, OccupancyGrid, generate_schedule_bitset, schedule_entry, sort_classes_by_size,
+    static_unscheduled_reason, unscheduled_conflict,
+)
+
+DEFAULT_NODE_LIMIT = 200_000
+DEFAULT_TIME_LIMIT = 10.0
+# Node budget unit of a search pass; pass i gets this times the i-th Luby number
+RESTART_NODE_LIMIT = 2_000
+
+_SKIP = 'skip'
+
+
+def _luby(i):
+    """i-th term (from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    if (1 << k) - 1 == i:
+        return 1 << (k - 1)
+    return _luby(i - (1 << (k - 1)) + 1)
+
+
+class BacktrackingSolver:
+    """
+    Branch-and-bound search over (instructor, cell, room) domains per class.
+
+    A class's domain is the union over cells c of free qualified instructors at c
+    times free rooms seating the section at c, for cells where the section is
+    free. Instead of materializing the triples, live domain sizes are tracked
+    as counts: free instructors per (specialization, cell) and free rooms per
+    (head count, cell). Booking one triple touches a single cell column of each
+    count matrix, which is the forward-checking step, and the MRV choice is one
+    vectorized product over the open classes.
+
+    Every class may also be left unscheduled, so the search maximizes placed
+    classes: a branch is pruned once its skips plus the open classes with an
+    empty domain can no longer beat the best schedule found so far, which
+    starts out as the bitset greedy's.
+    """
+
+    def __init__(self, classes_to_schedule, parsed_instructors, parsed_rooms, index=None):
+        if index is None:
+            index = SchedulingIndex(parsed_instructors, parsed_rooms)
+        self.index = index
+        self.parsed_instructors = parsed_instructors
+        self.parsed_rooms = parsed_rooms
+        self.grid = grid = OccupancyGrid(parsed_instructors, parsed_rooms)
+
+        self.conflicts = []
+        self.classes = []
+        for class_info in sort_classes_by_size(classes_to_schedule):
+            reason = static_unscheduled_reason(index, class_info)
+            if reason:
+                self.conflicts.append(unscheduled_conflict(class_info, reason))
+            else:
+                self.classes.append(class_info)
+
+        n_cells = len(grid.cells)
+        n_instructors = len(grid.instructor_names)
+
+        availability = np.zeros((n_instructors, n_cells), dtype=bool)
+        for instructor, cells in enumerate(grid.instructor_cells):
+            availability[instructor, cells] = True
+
+        specs = sorted({c['required_specialization'] for c in self.classes}, key=str)
+        spec_ids = {spec: q for q, spec in enumerate(specs)}
+        self.spec_members = np.zeros((len(specs), n_instructors), dtype=np.int32)
+        self.spec_instructors = []
+        for q, spec in enumerate(specs):
+            members = index.specialized_instructor_ids(spec)
+            self.spec_members[q, members] = 1
+            self.spec_instructors.append(members)
+
+        head_counts = sorted({c['section_students'] for c in self.classes})
+        head_ids = {n: h for h, n in enumerate(head_counts)}
+        # fits[h, r, c]: room r seats head count h at cell c
+        self.fits = grid.room_capacity[None, :, :] >= np.array(head_counts, dtype=np.int64)[:, None, None]
+
+        # Live counts: free qualified instructors and free fitting rooms per cell
+        self.instructors_free = self.spec_members @ availability.astype(np.int32)
+        self.rooms_free = self.fits.sum(axis=1, dtype=np.int32)
+
+        self.class_spec = np.array([spec_ids[c['required_specialization']] for c in self.classes], dtype=np.intp)
+        self.class_heads = np.array([head_ids[c['section_students']] for c in self.classes], dtype=np.intp)
+        self.class_section = np.array([grid.section_id(c['section_name']) for c in self.classes], dtype=np.intp)
+        self.section_free = np.ones((len(grid.section_names), n_cells), dtype=np.int32)
+
+        # Instructors with identical specialization sets are interchangeable
+        # within one cell, so only one of each is branched on.
+        signatures = {}
+        self.instructor_signature = [
+            signatures.setdefault(frozenset(np.flatnonzero(self.spec_members[:, i])), len(signatures))
+            for i in range(n_instructors)
+        ]
+
+    def _domain_sizes(self, classes):
+        """Live (instructor, room) pairs per cell, summed, for the given class ids."""
+        return (
+            self.section_free[self.class_section[classes]]
+            * self.instructors_free[self.class_spec[classes]]
+            * self.rooms_free[self.class_heads[classes]]
+        ).sum(axis=1)
+
+    def _values(self, k, rng=None, guide=None):
+        """
+        Yield candidate (instructor, room, cell) for class k, least constraining
+        cell first, then skip.
+
+        guide, the class's value in the best schedule so far, comes first while
+        it is still free, so a pass explores the neighbourhood of the incumbent:
+        only classes whose old slot was taken, or that were unplaced, branch.
+        With rng, each cell's slack is scaled by a random factor and the
+        instructors are shuffled, so restarts explore other branches.
+        """
+        grid = self.grid
+        section, q, h = self.class_section[k], self.class_spec[k], self.class_heads[k]
+        if guide is not None:
+            instructor, room, cell = guide
+            busy = grid.instructor_busy[instructor] | grid.room_busy[room]
+            if self.section_free[section, cell] and not busy >> cell & 1:
+                yield guide
+        slack = self.section_free[section] * self.instructors_free[q] * self.rooms_free[h]
+        cells = np.flatnonzero(slack)
+        priority = slack[cells]
+        instructors = self.spec_instructors[q]
+        if rng is not None:
+            priority = priority * rng.uniform(0.5, 1.0, len(cells))
+            instructors = rng.permutation(instructors).tolist()
+        for cell in cells[np.argsort(-priority, kind='stable')].tolist():
+            bit = 1 << cell
+            # Rooms of equal capacity at this cell are interchangeable; best fit first
+            rooms = {}
+            for room in np.flatnonzero(self.fits[h, :, cell]).tolist():
+                if not grid.room_busy[room] & bit:
+                    rooms.setdefault(int(grid.room_capacity[room, cell]), room)
+            seen_signatures = set()
+            for instructor in instructors:
+                if not grid.instructor_avail[instructor] & bit or grid.instructor_busy[instructor] & bit:
+                    continue
+                signature = self.instructor_signature[instructor]
+                if signature in seen_signatures:
+                    continue
+                seen_signatures.add(signature)
+                for capacity in sorted(rooms):
+                    value = (instructor, rooms[capacity], cell)
+                    if value != guide:
+                        yield value
+        yield _SKIP
+
+    def _greedy_incumbent(self):
+        """The bitset greedy's placements of self.classes, as {class id: (instructor, room, cell)}."""
+        greedy_schedule, _ = generate_schedule_bitset(self.classes, self.parsed_instructors, self.parsed_rooms,
+                                                      self.index)
+        # The greedy walks the classes in the same order and lists the placed ones in turn
+        grid = self.grid
+        placements = {}
+        entries = iter(greedy_schedule)
+        entry = next(entries, None)
+        for k, class_info in enumerate(self.classes):
+            if entry is None:
+                break
+            if entry['Section'] == class_info['section_name'] and entry['Subject Code'] == class_info['subject_code']:
+                placements[k] = (grid.instructor_ids[entry['Instructor']], grid.room_ids[entry['Room']],
+                                 grid.cell_ids[entry['Day'], entry['Time Slot']])
+                entry = next(entries, None)
+        return placements
+
+    def _apply(self, k, value, sign):
+        """Book (sign=1) or release (sign=-1) a value for class k and update the live counts."""
+        instructor, room, cell = value
+        section = self.class_section[k]
+        if sign > 0:
+            self.grid.book(instructor, room, section, cell)
+        else:
+            self.grid.release(instructor, room, section, cell)
+        self.instructors_free[:, cell] -= sign * self.spec_members[:, instructor]
+        self.rooms_free[:, cell] -= sign * self.fits[:, room, cell]
+        self.section_free[section, cell] += -sign
+
+    def _search(self, best_assignment, best_skipped, node_limit, deadline, rng=None):
+        """
+        One depth-first pass from an empty grid, keeping a leaf only if it skips
+        fewer classes than best_skipped. With rng the MRV choice is randomized
+        too: domain sizes are scaled by a random factor before the argmin.
+
+        Returns:
+            tuple: (best_assignment, best_skipped, nodes, finished) where finished
+                   means the whole tree was searched within node_limit and deadline.
+        """
+        n_classes = len(self.classes)
+        is_open = np.ones(n_classes, dtype=bool)
+        assignment = {}
+        skipped = 0
+        nodes = 0
+        finished = True
+
+        def open_frame():
+            open_ids = np.flatnonzero(is_open)
+            sizes = self._domain_sizes(open_ids)
+            if rng is not None:
+                sizes = sizes * rng.uniform(0.5, 1.0, len(open_ids))
+            # Classes are pre-sorted largest first, so argmin breaks MRV ties by size
+            k = int(open_ids[np.argmin(sizes)])
+            is_open[k] = False
+            return [k, self._values(k, rng, best_assignment.get(k)), None]
+
+        frames = [open_frame()]
+        while frames:
+            nodes += 1
+            if nodes >= node_limit or (nodes & 255 == 0 and time.perf_counter() >= deadline):
+                finished = False
+                break
+
+            frame = frames[-1]
+            k, values, current = frame
+            if current is _SKIP:
+                skipped -= 1
+            elif current is not None:
+                self._apply(k, current, -1)
+                del assignment[k]
+            frame[2] = None
+
+            value = next(values, None)
+            if value is None:
+                frames.pop()
+                is_open[k] = True
+                continue
+
+            if value is _SKIP:
+                skipped += 1
+            else:
+                self._apply(k, value, 1)
+                assignment[k] = value
+            frame[2] = value
+
+            open_ids = np.flatnonzero(is_open)
+            if not len(open_ids):
+                if skipped < best_skipped:
+                    best_skipped = skipped
+                    best_assignment = dict(assignment)
+                # Sibling values can only tie this leaf (or skip one more), so drop them
+                frame[1] = iter(())
+                continue
+
+            # Forward check: open classes left with an empty domain must be skipped
+            dead = int(np.count_nonzero(self._domain_sizes(open_ids) == 0))
+            if skipped + dead >= best_skipped:
+                continue
+            frames.append(open_frame())
+
+        # Unwind the live state so the next pass starts from an empty grid
+        for k, _, current in reversed(frames):
+            if current is not None and current is not _SKIP:
+                self._apply(k, current, -1)
+        return best_assignment, best_skipped, nodes, finished
+
+    def solve(self, node_limit=DEFAULT_NODE_LIMIT, time_limit=DEFAULT_TIME_LIMIT, seed=0):
+        """
+        Run the search within the node and time budget.
+
+        The bitset greedy's schedule is the starting incumbent, so the result
+        never places fewer classes. The search then runs as a series of
+        restarts. Pass i (from 1) may expand RESTART_NODE_LIMIT times the i-th
+        Luby number (1, 1, 2, 1, 1, 2, 4, 1, ...) nodes, capped by what is left
+        of node_limit, so short passes stay frequent while the occasional long
+        one can go deep. The first pass uses the deterministic value order;
+        later ones randomize it (from seed), so the budget is spread over
+        different top-level choices instead of being spent re-arranging the
+        last few classes of one branch. A pass that finishes proves the
+        incumbent optimal.
+
+        Returns:
+            tuple: (generated_schedule, conflicts, stats). When the budget runs
+                   out the best assignment found so far is returned.
+        """
+        start = time.perf_counter()
+        deadline = start + time_limit
+        best_assignment = self._greedy_incumbent()
+        greedy_placed = len(best_assignment)
+        best_skipped = len(self.classes) - greedy_placed
+        nodes = 0
+        restarts = 0
+        finished = not best_skipped
+        while not finished and nodes < node_limit and time.perf_counter() < deadline:
+            rng = np.random.default_rng(seed + restarts) if restarts else None
+            best_assignment, best_skipped, pass_nodes, finished = self._search(
+                best_assignment, best_skipped, min(RESTART_NODE_LIMIT * _luby(restarts + 1), node_limit - nodes),
+                deadline, rng)
+            nodes += pass_nodes
+            restarts += 1
+
+        generated_schedule = []
+        conflicts = list(self.conflicts)
+        for k, class_info in enumerate(self.classes):
+            if k in best_assignment:
+                instructor, room, cell = best_assignment[k]
+                generated_schedule.append(schedule_entry(self.grid, class_info, instructor, room, cell))
+            else:
+                conflicts.append(unscheduled_conflict(class_info, NO_COMMON_SLOT_REASON))
+
+        stats = {
+            'nodes': nodes,
+            'restarts': restarts,
+            'solve_time': time.perf_counter() - start,
+            'budget_exhausted': not finished,
+            'proven_optimal': finished,
+            'greedy_placed': greedy_placed,
+        }
+        return generated_schedule, conflicts, stats
+
+
+def generate_schedule_backtracking(classes_to_schedule, parsed_instructors, parsed_rooms, index=None,
+                                   node_limit=DEFAULT_NODE_LIMIT, time_limit=DEFAULT_TIME_LIMIT):
+    """Solve with BacktrackingSolver; returns (generated_schedule, conflicts, stats)."""
+    solver = BacktrackingSolver(classes_to_schedule, parsed_instructors, parsed_rooms, index)
+    return solver.solve(node_limit=node_limit, time_limit=time_limit)
@@ -0,0 +1,154 @@
+"""Benchmark the scheduling pipeline on synthetic or real datasets."""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from scheduler.data import DEFAULT_INPUT_FILES, get_classes_to_schedule, process_instructor_data, process_room_data
+from scheduler.encoding import encode_frame
+from scheduler.indexes import build_scheduling_index
+from scheduler.milp import ModelTooLargeError
+from scheduler.pipeline import ENGINES, generate_schedule_attempt
+from scheduler.synthetic import generate_dataset, write_dataset
+
+DEFAULT_SCALES = (1, 10)
+DEFAULT_ENGINES = ("bitset", "standard", "decomposition", "multistart", "backtracking")
+# Engines that start from the bitset greedy's schedule and must never place fewer classes
+GREEDY_FLOOR_ENGINES = ("multistart", "backtracking")
+
+
+def _measure(fn, with_memory):
+    """Run fn once; returns (result, wall seconds, peak traced bytes or None)."""
+    if with_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+        wall = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if with_memory else None
+    finally:
+        if with_memory:
+            tracemalloc.stop()
+    return result, wall, peak
+
+
+def benchmark_dataset(data_dir, engines=DEFAULT_ENGINES, with_memory=True, label=None):
+    """
+    Time every pipeline stage on the CSVs in data_dir, then each engine.
+
+    Wall times come from a run without tracemalloc; when with_memory is set,
+    each stage is run a second time under tracemalloc for its peak
+    allocation, so tracing overhead never inflates the timings.
+
+    Returns:
+        list: One dict per stage or engine with 'dataset', 'stage', 'wall_s',
+              'peak_mb', 'classes' and 'placed' (engines only).
+    """
+    label = label or data_dir
+    paths = {table: os.path.join(data_dir, name) for table, name in DEFAULT_INPUT_FILES.items()}
+    quiet = lambda message: None
+
+    stages = [
+        ('read_csv', lambda state: {t: encode_frame(pd.read_csv(p), t) for t, p in paths.items()}),
+        ('process_instructor_data', lambda state: process_instructor_data(state['read_csv']['instructors'])),
+        ('process_room_data', lambda state: process_room_data(state['read_csv']['rooms'])),
+        ('get_classes_to_schedule', lambda state: get_classes_to_schedule(
+            state['read_csv']['sections'], state['read_csv']['subjects'], state['read_csv']['curriculum'],
+            on_warning=quiet)),
+        ('build_scheduling_index', lambda state: build_scheduling_index(
+            state['process_instructor_data'], state['process_room_data'])),
+    ]
+
+    rows = []
+    state = {}
+    for stage, fn in stages:
+        state[stage], wall, _ = _measure(lambda: fn(state), False)
+        peak = _measure(lambda: fn(state), True)[2] if with_memory else None
+        rows.append({'dataset': label, 'stage': stage, 'wall_s': wall, 'peak_mb': _mb(peak)})
+
+    classes = state['get_classes_to_schedule']
+    for engine in engines:
+        def run():
+            return generate_schedule_attempt(
+                classes, state['process_instructor_data'], state['process_room_data'], engine=engine,
+                index=state['build_scheduling_index'], on_warning=quiet)
+        try:
+            (schedule, _), wall, _ = _measure(run, False)
+            peak = _measure(run, True)[2] if with_memory else None
+        except (ImportError, ModelTooLargeError) as e:
+            rows.append({'dataset': label, 'stage': f'engine:{engine}', 'skipped': str(e)})
+            continue
+        rows.append({'dataset': label, 'stage': f'engine:{engine}', 'wall_s': wall, 'peak_mb': _mb(peak),
+                     'classes': len(classes), 'placed': len(schedule)})
+    return rows
+
+
+def greedy_floor_violations(rows):
+    """
+    Messages for every dataset where a GREEDY_FLOOR_ENGINES engine placed fewer
+    classes than the bitset engine did in the same benchmark run.
+    """
+    placed = {(row['dataset'], row['stage']): row['placed'] for row in rows if 'placed' in row}
+    violations = []
+    for (dataset, stage), count in placed.items():
+        greedy = placed.get((dataset, 'engine:bitset'))
+        if greedy is not None and stage.removeprefix('engine:') in GREEDY_FLOOR_ENGINES and count < greedy:
+            violations.append(f"{dataset}: {stage} placed {count} classes, fewer than the bitset greedy's {greedy}")
+    return violations
+
+
+def _mb(n_bytes):
+    return None if n_bytes is None else n_bytes / (1024 * 1024)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m scheduler.benchmark',
+        description="Time each pipeline stage and engine on synthetic datasets (or --data-dir).")
+    parser.add_argument('--scales', type=float, nargs='+', default=list(DEFAULT_SCALES),
+                        help="Synthetic dataset scales to run (default: 1 10)")
+    parser.add_argument('--data-dir', action='append', default=[],
+                        help="Benchmark an existing dataset directory instead (repeatable)")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(DEFAULT_ENGINES))
+    parser.add_argument('--availability-density', type=float)
+    parser.add_argument('--room-density', type=float)
+    parser.add_argument('--capacity-spread', type=float)
+    parser.add_argument('--specialization-scarcity', type=float)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--output', help="Also write the results to this .csv or .json file")
+    args = parser.parse_args(argv)
+
+    knobs = {name: getattr(args, name) for name in
+             ('availability_density', 'room_density', 'capacity_spread', 'specialization_scarcity')
+             if getattr(args, name) is not None}
+
+    rows = []
+    for data_dir in args.data_dir:
+        rows += benchmark_dataset(data_dir, args.engines, not args.no_memory)
+    if not args.data_dir:
+        for scale in args.scales:
+            with tempfile.TemporaryDirectory() as data_dir:
+                write_dataset(generate_dataset(scale, seed=args.seed, **knobs), data_dir)
+                rows += benchmark_dataset(data_dir, args.engines, not args.no_memory, label=f"synthetic x{scale:g}")
+
+    results = pd.DataFrame(rows)
+    with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.float_format', '{:.3f}'.format):
+        print(results.to_string(index=False))
+    if args.output:
+        if args.output.endswith('.json'):
+            results.to_json(args.output, orient='records', indent=2)
+        else:
+            results.to_csv(args.output, index=False)
+
+    violations = greedy_floor_violations(rows)
+    for message in violations:
+        print(f"ERROR: {message}")
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
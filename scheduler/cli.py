@@ -0,0 +1,162 @@
+"""Command-line batch scheduling: five CSVs in, schedule and conflicts out."""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from scheduler.annealing import DEFAULT_TIME_LIMIT as ANNEAL_DEFAULT_TIME_LIMIT
+from scheduler.data import (DEFAULT_INPUT_FILES, get_classes_to_schedule, process_instructor_data,
+                            process_room_data)
+from scheduler.encoding import encode_frame
+from scheduler.export import export_schedule_to_csv
+from scheduler.indexes import build_scheduling_index
+from scheduler.instrumentation import DEFAULT_RUN_LOG, PhaseRecorder, append_run_log
+from scheduler.milp import ModelTooLargeError
+from scheduler.pipeline import ENGINES, generate_schedule_attempt
+from scheduler.snapshot import SNAPSHOT_EXTENSION, save_snapshot
+
+CONFLICT_COLUMNS = ['type', 'section', 'subject', 'instructor', 'room', 'day', 'time_slot',
+                    'students', 'required_specialization', 'classes_involved', 'reason']
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m scheduler',
+        description="Generate a class schedule from the five scheduling CSVs without the Streamlit UI.")
+    parser.add_argument('--data-dir', default='.',
+                        help="Directory holding the input CSVs under their default names (default: .)")
+    for table, file_name in DEFAULT_INPUT_FILES.items():
+        parser.add_argument(f'--{table}', metavar='CSV', help=f"{table} CSV (default: DATA_DIR/{file_name})")
+    parser.add_argument('--out-dir', default='.', help="Directory for the output files (default: .)")
+    parser.add_argument('--format', choices=('csv', 'json', 'both'), default='csv',
+                        help="Output format for schedule and conflicts (default: csv)")
+    parser.add_argument('--engine', choices=ENGINES, default='bitset', help="Scheduling engine (default: bitset)")
+    parser.add_argument('--time-limit', type=float, help="Time limit in seconds (backtracking, milp)")
+    parser.add_argument('--node-limit', type=int, help="Search node budget (backtracking)")
+    parser.add_argument('--starts', type=int, help="Number of randomized starts (multistart)")
+    parser.add_argument('--gap', type=float, help="Acceptable relative optimality gap, e.g. 0.02 (milp)")
+    parser.add_argument('--anneal', type=float, nargs='?', const=ANNEAL_DEFAULT_TIME_LIMIT, metavar='SECONDS',
+                        help="Run the simulated-annealing pass afterwards "
+                             f"(default {ANNEAL_DEFAULT_TIME_LIMIT:g}s when given without a value)")
+    parser.add_argument('--optimize-rooms', action='store_true',
+                        help="Re-assign rooms best fit per time slot and retry unscheduled classes")
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help=f"Also save a project snapshot (.{SNAPSHOT_EXTENSION}) the app can restore; needs pyarrow")
+    parser.add_argument('--timings', action='store_true',
+                        help="Print wall/CPU time and peak allocation per phase and append them to the run log")
+    parser.add_argument('--run-log', default=DEFAULT_RUN_LOG, metavar='PATH',
+                        help=f"JSONL run log used with --timings (default: {DEFAULT_RUN_LOG})")
+    parser.add_argument('--quiet', action='store_true', help="Only print errors; progress and warnings are suppressed")
+    return parser
+
+
+def solver_options_from_args(args):
+    """Engine keyword arguments for the options given on the command line."""
+    options = {}
+    if args.time_limit is not None and args.engine in ('backtracking', 'milp'):
+        options['time_limit'] = args.time_limit
+    if args.node_limit is not None and args.engine == 'backtracking':
+        options['node_limit'] = args.node_limit
+    if args.starts is not None and args.engine == 'multistart':
+        options['n_starts'] = args.starts
+    if args.gap is not None and args.engine == 'milp':
+        options['mip_rel_gap'] = args.gap
+    return options
+
+
+def read_inputs(args):
+    """The five input DataFrames keyed by table name, with categorical/small-integer columns."""
+    frames = {}
+    for table, file_name in DEFAULT_INPUT_FILES.items():
+        path = getattr(args, table) or os.path.join(args.data_dir, file_name)
+        frames[table] = encode_frame(pd.read_csv(path), table)
+    return frames
+
+
+def write_outputs(schedule, conflicts, out_dir, output_format):
+    """Write schedule and conflicts files; returns the paths written."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    if output_format in ('csv', 'both'):
+        path = os.path.join(out_dir, 'schedule.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(export_schedule_to_csv(pd.DataFrame(schedule)) or '')
+        paths.append(path)
+        path = os.path.join(out_dir, 'conflicts.csv')
+        conflicts_df = pd.DataFrame(conflicts)
+        columns = [c for c in CONFLICT_COLUMNS if c in conflicts_df.columns]
+        conflicts_df[columns + [c for c in conflicts_df.columns if c not in columns]].to_csv(path, index=False)
+        paths.append(path)
+    if output_format in ('json', 'both'):
+        for name, records in (('schedule', schedule), ('conflicts', conflicts)):
+            path = os.path.join(out_dir, f'{name}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, indent=2, default=lambda v: v.item() if hasattr(v, 'item') else str(v))
+            paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    say = (lambda *a: None) if args.quiet else print
+    warn = (lambda message: None) if args.quiet else (lambda message: print(f"Warning: {message}", file=sys.stderr))
+
+    # Without --timings the recorder only measures time, which costs nothing noticeable
+    recorder = PhaseRecorder(trace_memory=args.timings)
+    start = time.perf_counter()
+    try:
+        with recorder.phase('read_csv'):
+            frames = read_inputs(args)
+    except (OSError, pd.errors.ParserError) as e:
+        print(f"Error reading input CSVs: {e}", file=sys.stderr)
+        return 1
+
+    with recorder.phase('process_instructor_data'):
+        parsed_instructors = process_instructor_data(frames['instructors'])
+    with recorder.phase('process_room_data'):
+        parsed_rooms = process_room_data(frames['rooms'])
+    with recorder.phase('get_classes_to_schedule'):
+        classes = get_classes_to_schedule(frames['sections'], frames['subjects'], frames['curriculum'],
+                                          on_warning=warn)
+    with recorder.phase('build_scheduling_index'):
+        index = build_scheduling_index(parsed_instructors, parsed_rooms)
+
+    solver_stats = {}
+    try:
+        with recorder.phase('generate_schedule_attempt'):
+            schedule, conflicts = generate_schedule_attempt(
+                classes, parsed_instructors, parsed_rooms, engine=args.engine, index=index,
+                solver_options=solver_options_from_args(args), solver_stats=solver_stats,
+                anneal_time_limit=args.anneal, optimize_rooms=args.optimize_rooms, on_warning=warn)
+    except (ImportError, ModelTooLargeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    with recorder.phase('write_outputs'):
+        paths = write_outputs(schedule, conflicts, args.out_dir, args.format)
+        if args.snapshot:
+            try:
+                schedule_df = encode_frame(pd.DataFrame(schedule), 'schedule')
+                snapshot = save_snapshot(dict(frames, classes=classes, schedule=schedule_df), conflicts,
+                                         {'engine': args.engine})
+            except ImportError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 2
+            with open(args.snapshot, 'wb') as f:
+                f.write(snapshot)
+            paths.append(args.snapshot)
+    if args.timings:
+        timings = pd.DataFrame(recorder.phases)
+        with pd.option_context('display.float_format', '{:.3f}'.format):
+            print(timings.to_string(index=False), file=sys.stderr)
+        append_run_log({'kind': 'cli', 'engine': args.engine, 'classes': len(classes), 'scheduled': len(schedule),
+                        'phases': recorder.phases}, path=args.run_log)
+    unscheduled = sum(1 for c in conflicts if c['type'] == 'Unscheduled Class')
+    say(f"Scheduled {len(schedule)} of {len(classes)} classes with the {args.engine} engine "
+        f"in {time.perf_counter() - start:.2f}s; {unscheduled} unscheduled, {len(conflicts)} conflict(s).")
+    for path in paths:
+        say(f"Wrote {path}")
+    return 0
@@ -0,0 +1,148 @@
+"""Parsing of the uploaded CSV tables into the structures the engines consume."""
+import numpy as np
+import pandas as pd
+
+from scheduler.timeslots import SLOT_REGISTRY, TIME_SLOTS_ORDER_24HR  # noqa: F401 (re-exported)
+
+# Upper-case day names in calendar order
+DAYS_ORDER = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]
+
+# Input table -> default file name in a data directory
+DEFAULT_INPUT_FILES = {
+    'sections': 'SCHEDULING_DATA_sections.csv',
+    'instructors': 'SCHEDULING_DATA_instructors.csv',
+    'subjects': 'SCHEDULING_DATA_subjects.csv',
+    'rooms': 'SCHEDULING_DATA_rooms.csv',
+    'curriculum': 'curriculum_mapping.csv',
+}
+
+
+def _print_warning(message):
+    print(f"Warning: {message}")
+
+
+def _group_rows(keys):
+    """
+    Group row positions by key, keys in order of first appearance.
+
+    Returns (unique keys, row order, bounds): rows order[bounds[i]:bounds[i + 1]]
+    belong to key i and keep their file order, since the sort is stable.
+    """
+    codes, uniques = pd.factorize(keys, use_na_sentinel=False)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(codes[order])) + 1, [len(codes)]))
+    return uniques.tolist(), order, bounds
+
+
+def _cell_tuples(raw_df, order):
+    """
+    (Day, Time Slot) tuples for the rows in order, as an object array. Slots
+    are canonicalized through the registry, so '09:00-10:00' in one file and
+    '9:00-10:00' in another land in the same cell.
+    """
+    time_slots = SLOT_REGISTRY.canonical_list(raw_df['Time Slot'].to_numpy()[order].tolist())
+    cells = np.empty(len(order), dtype=object)
+    cells[:] = list(zip(raw_df['Day'].to_numpy()[order].tolist(), time_slots))
+    return cells
+
+
+def _as_int_list(values):
+    """Python ints with int() semantics: floats truncate, NaN raises ValueError."""
+    if values.dtype.kind in 'iub':
+        return values.astype(np.int64).tolist()
+    if values.dtype.kind == 'f':
+        if np.isnan(values).any():
+            raise ValueError("cannot convert float NaN to integer")
+        return values.astype(np.int64).tolist()
+    return [int(value) for value in values.tolist()]
+
+
+def process_instructor_data(raw_df):
+    """
+    Instructor name -> {'availability': [(day, slot), ...], 'specializations': set}.
+
+    Availability keeps file order and duplicates; names keep order of first
+    appearance. Rows are grouped in bulk rather than walked one by one.
+    """
+    if raw_df is None: return None
+    names, order, bounds = _group_rows(raw_df['Instructor'])
+    cells = _cell_tuples(raw_df, order)
+    specializations = raw_df['Specialization'].to_numpy()[order]
+    return {
+        name: {'availability': cells[start:end].tolist(), 'specializations': set(specializations[start:end].tolist())}
+        for name, start, end in zip(names, bounds[:-1].tolist(), bounds[1:].tolist())
+    }
+
+
+def process_room_data(raw_df):
+    """
+    Room name -> {(day, slot): {'capacity': int, 'is_available': True}}.
+
+    A cell listed twice keeps its first position and its last capacity, as
+    repeated assignment would.
+    """
+    if raw_df is None: return None
+    rooms, order, bounds = _group_rows(raw_df['Room'])
+    cells = _cell_tuples(raw_df, order)
+    capacities = _as_int_list(raw_df['Max Capacity'].to_numpy()[order])
+    parsed_rooms = {}
+    for room_name, start, end in zip(rooms, bounds[:-1].tolist(), bounds[1:].tolist()):
+        parsed_rooms[room_name] = {
+            cell: {'capacity': capacity, 'is_available': True}
+            for cell, capacity in zip(cells[start:end].tolist(), capacities[start:end])
+        }
+    return parsed_rooms
+
+
+def get_classes_to_schedule(sections_df, subjects_df, curriculum_df, on_warning=None):
+    """
+    One class dict per (section, curriculum subject), sections in file order
+    and each section's subjects in curriculum order.
+
+    Built as one join of sections and curriculum on (Course, Year Level),
+    then subjects on Subject Code. Curriculum entries whose subject code is
+    not in the subjects table are skipped and reported in a single message.
+
+    on_warning is called with a message for each problem found (the UI passes
+    st.warning); by default messages are printed.
+    """
+    on_warning = on_warning or _print_warning
+    if sections_df is None or subjects_df is None or curriculum_df is None:
+        on_warning("One or more required dataframes for generating class list not loaded.")
+        return []
+    sections = sections_df[['Course', 'Year Level', 'Section', 'Students']].assign(_section_pos=range(len(sections_df)))
+    curriculum = curriculum_df[['Course', 'Year Level', 'Subject Code']].assign(
+        _curriculum_pos=range(len(curriculum_df)))
+    subjects = subjects_df[['Subject Code', 'Subject Name', 'Required Specialization']].drop_duplicates(
+        'Subject Code', keep='last')
+
+    expanded = sections.merge(curriculum, on=['Course', 'Year Level']).merge(
+        subjects, on='Subject Code', how='left', indicator=True)
+    expanded = expanded.sort_values(['_section_pos', '_curriculum_pos'], kind='stable')
+
+    missing = expanded['_merge'] == 'left_only'
+    if missing.any():
+        on_warning(_missing_subjects_report(expanded[missing]))
+    found = expanded[~missing]
+
+    columns = {
+        'section_course': 'Course', 'section_year_level': 'Year Level', 'section_name': 'Section',
+        'section_students': 'Students', 'subject_code': 'Subject Code', 'subject_name': 'Subject Name',
+        'required_specialization': 'Required Specialization',
+    }
+    # tolist() yields plain Python values, as the row-by-row version did
+    values = [found[column].tolist() for column in columns.values()]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _missing_subjects_report(missing_rows, max_sections=5):
+    """One message listing each unknown subject code with the sections that need it."""
+    lines = []
+    for subject_code, sections in missing_rows.groupby('Subject Code', sort=False, dropna=False)['Section']:
+        names = sections.tolist()
+        shown = ', '.join(str(name) for name in names[:max_sections])
+        if len(names) > max_sections:
+            shown += f", and {len(names) - max_sections} more"
+        lines.append(f"- '{subject_code}': {len(names)} section(s) ({shown})")
+    return (f"{len(missing_rows)} curriculum entries were skipped because {len(lines)} subject code(s) "
+            f"are not in the subjects list:\n" + "\n".join(lines))
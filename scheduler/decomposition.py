@@ -0,0 +1,244 @@
+"""Two-phase engine: DSatur time-slot coloring, then per-slot instructor and room matching."""
+import heapq
+import time
+
+import numpy as np
+
+from scheduler.indexes import SchedulingIndex
+from scheduler.matching import assign_rooms_best_fit, hopcroft_karp
+from scheduler.occupancy import (
+    NO_COMMON_SLOT_REASON, OccupancyGrid, schedule_entry, sort_classes_by_size,
+    static_unscheduled_reason, unscheduled_conflict,
+)
+
+MAX_ROUNDS = 4
+
+
+class DecompositionSolver:
+    """
+    Split placement into choosing a cell per class, then resources per cell.
+
+    Phase one colors the class conflict graph with (day, time slot) cells.
+    Classes are adjacent when they share a section (never the same cell) or a
+    candidate instructor (the same cell only while enough instructors remain).
+    DSatur order: the class with the fewest cells still open goes next, ties to
+    the higher conflict degree, then the larger section. A cell stays open for a
+    class while its section is free there, fewer classes of its specialization
+    sit there than qualified instructors are available, and the cell's rooms
+    still pass the nested-capacity count for its head count. All three counts
+    only grow, so each (group, cell) closes at most once and only the classes in
+    that group are touched.
+
+    Phase two handles every cell on its own: Hopcroft–Karp matches the cell's
+    classes to qualified available instructors, then rooms are handed out best
+    fit. The room counts make the room step exact; the per-specialization
+    instructor count is necessary but not sufficient when instructors hold
+    several specializations, so classes left unmatched are banned from that
+    cell and phase one is re-run, keeping the best round.
+    """
+
+    def __init__(self, classes_to_schedule, parsed_instructors, parsed_rooms, index=None):
+        if index is None:
+            index = SchedulingIndex(parsed_instructors, parsed_rooms)
+        self.grid = grid = OccupancyGrid(parsed_instructors, parsed_rooms)
+
+        self.conflicts = []
+        self.classes = []
+        for class_info in sort_classes_by_size(classes_to_schedule):
+            reason = static_unscheduled_reason(index, class_info)
+            if reason:
+                self.conflicts.append(unscheduled_conflict(class_info, reason))
+            else:
+                self.classes.append(class_info)
+
+        n_cells = len(grid.cells)
+        n_instructors = len(grid.instructor_names)
+        availability = np.zeros((n_instructors, n_cells), dtype=bool)
+        for instructor, cells in enumerate(grid.instructor_cells):
+            availability[instructor, cells] = True
+
+        specs = sorted({c['required_specialization'] for c in self.classes}, key=str)
+        spec_ids = {spec: q for q, spec in enumerate(specs)}
+        spec_members = np.zeros((len(specs), n_instructors), dtype=bool)
+        self.spec_instructors = []
+        for q, spec in enumerate(specs):
+            members = index.specialized_instructor_ids(spec)
+            spec_members[q, members] = True
+            self.spec_instructors.append(members)
+        self.spec_available = spec_members.astype(np.int32) @ availability.astype(np.int32)
+
+        capacities = grid.room_capacity
+        self.levels = np.unique(capacities[capacities >= 0])
+        self.rooms_at_level = (capacities[:, :, None] >= self.levels[None, None, :]).sum(axis=0).T
+
+        self.class_spec = np.array([spec_ids[c['required_specialization']] for c in self.classes], dtype=np.intp)
+        self.class_level = np.searchsorted(self.levels, [c['section_students'] for c in self.classes]).astype(np.intp)
+        self.class_section = np.array([grid.section_id(c['section_name']) for c in self.classes], dtype=np.intp)
+
+        # Cells a class could ever use: a qualified instructor and a fitting room
+        self.candidates = (
+            (self.spec_available[self.class_spec] > 0)
+            & (self.rooms_at_level[self.class_level] > 0)
+        ) if len(self.classes) else np.zeros((0, n_cells), dtype=bool)
+
+        # Conflict degree: classes sharing the section or overlapping in instructors
+        n_sections = len(grid.section_names)
+        overlap = (spec_members.astype(np.int32) @ spec_members.T.astype(np.int32) > 0).astype(np.int64)
+        spec_count = np.bincount(self.class_spec, minlength=len(specs))
+        section_count = np.bincount(self.class_section, minlength=n_sections)
+        section_spec_count = np.zeros((n_sections, len(specs)), dtype=np.int64)
+        np.add.at(section_spec_count, (self.class_section, self.class_spec), 1)
+        instructor_neighbors = (overlap @ spec_count)[self.class_spec]
+        both = (section_spec_count @ overlap)[self.class_section, self.class_spec]
+        self.degree = instructor_neighbors + section_count[self.class_section] - both - 1
+
+        self.group_members = {}
+        for k, key in enumerate(zip(self.class_spec.tolist(), self.class_level.tolist())):
+            self.group_members.setdefault(key, []).append(k)
+        self.section_members = {}
+        for k, section in enumerate(self.class_section.tolist()):
+            self.section_members.setdefault(section, []).append(k)
+
+    def _color(self, banned):
+        """Phase one: a cell per class (-1 if none), honoring the banned (class, cell) pairs."""
+        n_classes, n_levels = len(self.classes), len(self.levels)
+        feasible = self.candidates.copy()
+        for k, cell in banned:
+            feasible[k, cell] = False
+        open_count = feasible.sum(axis=1)
+        spec_used = np.zeros_like(self.spec_available)
+        placed_at_level = np.zeros_like(self.rooms_at_level)
+        group_open = {key: np.ones(feasible.shape[1], dtype=bool) for key in self.group_members}
+        colors = np.full(n_classes, -1, dtype=np.intp)
+        is_open = np.ones(n_classes, dtype=bool)
+
+        heap = [(int(open_count[k]), -int(self.degree[k]), k) for k in range(n_classes)]
+        heapq.heapify(heap)
+
+        def close(members, cell):
+            members = np.asarray(members)
+            hit = members[is_open[members] & feasible[members, cell]]
+            feasible[hit, cell] = False
+            open_count[hit] -= 1
+            for k in hit.tolist():
+                heapq.heappush(heap, (int(open_count[k]), -int(self.degree[k]), k))
+
+        while heap:
+            count, _, k = heapq.heappop(heap)
+            if not is_open[k] or count != open_count[k]:
+                continue  # stale heap entry
+            is_open[k] = False
+            cells = np.flatnonzero(feasible[k])
+            if not len(cells):
+                continue
+            q, level = self.class_spec[k], self.class_level[k]
+            # Least constraining cell: most spare instructors, then most spare rooms
+            spare_instructors = self.spec_available[q, cells] - spec_used[q, cells]
+            spare_rooms = self.rooms_at_level[level, cells] - placed_at_level[level, cells]
+            score = spare_instructors * (int(spare_rooms.max()) + 1) + spare_rooms
+            cell = int(cells[np.argmax(score)])
+            colors[k] = cell
+
+            spec_used[q, cell] += 1
+            placed_at_level[:level + 1, cell] += 1
+            close(self.section_members[self.class_section[k]], cell)
+
+            spec_ok = spec_used[:, cell] < self.spec_available[:, cell]
+            room_ok = np.logical_and.accumulate(placed_at_level[:, cell] < self.rooms_at_level[:, cell]) \
+                if n_levels else np.zeros(0, dtype=bool)
+            for key, members in self.group_members.items():
+                if group_open[key][cell] and not (spec_ok[key[0]] and room_ok[key[1]]):
+                    group_open[key][cell] = False
+                    close(members, cell)
+        return colors
+
+    def _match(self, colors):
+        """Phase two: instructors by Hopcroft–Karp and rooms best fit, per cell."""
+        grid = self.grid
+        by_cell = {}
+        for k, cell in enumerate(colors.tolist()):
+            if cell >= 0:
+                by_cell.setdefault(cell, []).append(k)
+
+        placements = {}
+        unmatched = []
+        for cell, members in by_cell.items():
+            bit = 1 << cell
+            instructor_slots = {}
+            adjacency = []
+            for k in members:
+                adjacency.append([
+                    instructor_slots.setdefault(i, len(instructor_slots))
+                    for i in self.spec_instructors[self.class_spec[k]]
+                    if grid.instructor_avail[i] & bit
+                ])
+            slot_instructors = list(instructor_slots)
+            matched = hopcroft_karp(adjacency, len(slot_instructors))
+            placed = [(k, slot_instructors[m]) for k, m in zip(members, matched) if m >= 0]
+            unmatched.extend((k, cell) for k, m in zip(members, matched) if m < 0)
+
+            rooms = assign_rooms_best_fit(
+                grid.room_capacity[:, cell], [self.classes[k]['section_students'] for k, _ in placed])
+            for (k, instructor), room in zip(placed, rooms):
+                if room >= 0:
+                    placements[k] = (instructor, room, cell)
+                else:
+                    unmatched.append((k, cell))
+        return placements, unmatched
+
+    def solve(self, max_rounds=MAX_ROUNDS):
+        """
+        Color, match, and repeat with unmatched (class, cell) pairs banned.
+
+        Returns:
+            tuple: (generated_schedule, conflicts, stats)
+
+        Raises:
+            ValueError: If max_rounds is less than 1.
+        """
+        if max_rounds < 1:
+            raise ValueError(f"max_rounds must be at least 1, got {max_rounds}.")
+        start = time.perf_counter()
+        banned = set()
+        best = {}
+        coloring_time = matching_time = 0.0
+        for rounds in range(1, max_rounds + 1):
+            phase_start = time.perf_counter()
+            colors = self._color(banned)
+            coloring_time += time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            placements, unmatched = self._match(colors)
+            matching_time += time.perf_counter() - phase_start
+
+            if len(placements) > len(best) or rounds == 1:
+                best = placements
+                colors_used = len(set(colors.tolist()) - {-1})
+            if not unmatched:
+                break
+            banned.update(unmatched)
+
+        generated_schedule = []
+        conflicts = list(self.conflicts)
+        for k, class_info in enumerate(self.classes):
+            if k in best:
+                instructor, room, cell = best[k]
+                generated_schedule.append(schedule_entry(self.grid, class_info, instructor, room, cell))
+            else:
+                conflicts.append(unscheduled_conflict(class_info, NO_COMMON_SLOT_REASON))
+
+        stats = {
+            'rounds': rounds,
+            'cells_used': colors_used,
+            'coloring_time': coloring_time,
+            'matching_time': matching_time,
+            'solve_time': time.perf_counter() - start,
+        }
+        return generated_schedule, conflicts, stats
+
+
+def generate_schedule_decomposition(classes_to_schedule, parsed_instructors, parsed_rooms, index=None,
+                                    max_rounds=MAX_ROUNDS):
+    """Solve with DecompositionSolver; returns (generated_schedule, conflicts, stats)."""
+    solver = DecompositionSolver(classes_to_schedule, parsed_instructors, parsed_rooms, index)
+    return solver.solve(max_rounds=max_rounds)
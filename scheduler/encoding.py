@@ -0,0 +1,101 @@
+"""Dictionary-encoded dtypes for the scheduling tables: categoricals and small integers."""
+import numpy as np
+import pandas as pd
+
+from scheduler.data import DAYS_ORDER
+from scheduler.timeslots import SLOT_REGISTRY
+
+# Column kind per table. 'day' and 'time_slot' become ordered categoricals in
+# calendar / clock order, 'label' an unordered categorical with sorted categories,
+# 'count' the smallest signed integer dtype of at least 16 bits. Columns not
+# listed (e.g. the unique Subject Name in subjects) are left as they are.
+TABLE_SCHEMAS = {
+    'sections': {'Course': 'label', 'Year Level': 'count', 'Section': 'label', 'Students': 'count'},
+    'instructors': {'Instructor': 'label', 'Day': 'day', 'Time Slot': 'time_slot', 'From Department': 'label',
+                    'Specialization': 'label'},
+    'subjects': {'Required Specialization': 'label'},
+    'rooms': {'Room': 'label', 'Day': 'day', 'Time Slot': 'time_slot', 'Max Capacity': 'count'},
+    'curriculum': {'Course': 'label', 'Year Level': 'count', 'Subject Code': 'label'},
+    'schedule': {'Section': 'label', 'Subject Code': 'label', 'Subject Name': 'label', 'Instructor': 'label',
+                 'Room': 'label', 'Day': 'day', 'Time Slot': 'time_slot', 'Students': 'count',
+                 'Room Capacity': 'count'},
+}
+
+_DAY_RANKS = {day: rank for rank, day in enumerate(DAYS_ORDER)}
+
+
+def _is_text(series):
+    return isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object or pd.api.types.is_string_dtype(
+        series.dtype)
+
+
+def _category_dtype(series, kind):
+    values = series.dropna().unique().tolist()
+    if kind == 'label':
+        return pd.CategoricalDtype(sorted(values, key=str))
+    if kind == 'time_slot':
+        return pd.CategoricalDtype(sorted(values, key=SLOT_REGISTRY.sort_key), ordered=True)
+    # Days match DAYS_ORDER case-insensitively ('Monday' and 'MONDAY' both rank
+    # first); anything outside the calendar sorts after it
+    return pd.CategoricalDtype(
+        sorted(values, key=lambda v: (_DAY_RANKS.get(str(v).upper(), len(_DAY_RANKS)), str(v))), ordered=True)
+
+
+def _encode_column(series, kind):
+    if kind == 'count':
+        if series.dtype.kind not in 'iu':
+            return series  # floats with NaN, or text: leave for the parsers to report
+        encoded = pd.to_numeric(series, downcast='integer')
+        return encoded.astype(np.int16) if encoded.dtype.itemsize < 2 else encoded
+    if not _is_text(series):
+        return series
+    return series.astype(_category_dtype(series, kind))
+
+
+def encode_frame(df, table):
+    """
+    Copy of df with the columns named in TABLE_SCHEMAS[table] encoded.
+
+    Values are unchanged (a categorical still yields the same strings, and
+    tolist() on a small integer column the same Python ints), so encoded
+    frames can be passed anywhere a plain one was; columns that are missing or
+    hold unexpected types are left alone. Sorting on 'Day' or 'Time Slot'
+    follows the calendar instead of the alphabet.
+    """
+    if df is None:
+        return None
+    schema = TABLE_SCHEMAS[table]
+    return df.assign(**{column: _encode_column(df[column], kind)
+                        for column, kind in schema.items() if column in df.columns})
+
+
+def set_schedule_values(schedule_df, index, values):
+    """
+    Assign values (column -> value) to the schedule row at index, in place.
+
+    Categorical columns gain any new category first; the day and time slot
+    columns are re-encoded so the new value takes its calendar / clock place
+    instead of sorting last. Integer columns are widened to object when given
+    a non-integer such as 'N/A (Forced)'.
+    """
+    schema = TABLE_SCHEMAS['schedule']
+    for column, value in values.items():
+        if column in schedule_df.columns:
+            dtype = schedule_df[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                if not pd.isna(value) and value not in dtype.categories:
+                    kind = schema.get(column)
+                    if dtype.ordered and kind in ('day', 'time_slot'):
+                        new_dtype = _category_dtype(pd.Series([*dtype.categories, value], dtype=object), kind)
+                        schedule_df[column] = schedule_df[column].astype(new_dtype)
+                    else:
+                        schedule_df[column] = schedule_df[column].cat.add_categories([value])
+            elif dtype.kind in 'iu' and not isinstance(value, (int, np.integer)):
+                schedule_df[column] = schedule_df[column].astype(object)
+        schedule_df.loc[index, column] = value
+    return schedule_df
+
+
+def frame_memory(df):
+    """Deep memory of df in bytes, for before/after comparisons."""
+    return 0 if df is None else int(df.memory_usage(index=True, deep=True).sum())
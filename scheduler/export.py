@@ -0,0 +1,26 @@
+"""Schedule export helpers shared by the app and the command line."""
+from scheduler.encoding import encode_frame
+
+
+def export_schedule_to_csv(schedule_df):
+    """Export schedule to CSV format with enhanced formatting."""
+    if schedule_df is None or schedule_df.empty:
+        return None
+    
+    # Encoded copy: Day and Time Slot sort in calendar order as integer codes
+    export_df = encode_frame(schedule_df, 'schedule')
+    
+    # Sort by multiple criteria for better organization
+    export_df = export_df.sort_values(['Day', 'Time Slot', 'Room', 'Section'], kind='stable')
+    
+    # Reorder columns for better readability
+    column_order = ['Day', 'Time Slot', 'Subject Code', 'Subject Name', 
+                    'Section', 'Instructor', 'Room', 'Students', 'Room Capacity']
+    
+    # Only include columns that exist
+    export_columns = [col for col in column_order if col in export_df.columns]
+    export_df = export_df[export_columns]
+    
+    # Convert to CSV with proper formatting
+    csv = export_df.to_csv(index=False, encoding='utf-8-sig')  # utf-8-sig for Excel compatibility
+    return csv
@@ -0,0 +1,66 @@
+"""Specialization and room-capacity lookups built once per dataset."""
+from bisect import bisect_left
+
+
+class SchedulingIndex:
+    """
+    Inverted indexes over parsed instructor and room data.
+
+    Instructor and room ids are positions in the parsed dicts' insertion order,
+    the same ids OccupancyGrid assigns, so both engines can share one index.
+    Lookups return entities in that original order so the greedy engines keep
+    making the same choices they made when scanning the dicts directly.
+    """
+
+    def __init__(self, parsed_instructors, parsed_rooms):
+        self.instructor_names = list(parsed_instructors)
+        self.room_names = list(parsed_rooms)
+
+        # Specialization -> instructor ids
+        self.instructor_ids_by_spec = {}
+        for instructor_id, name in enumerate(self.instructor_names):
+            for spec in parsed_instructors[name]['specializations']:
+                self.instructor_ids_by_spec.setdefault(spec, []).append(instructor_id)
+
+        # Rooms sorted by their largest capacity in any slot, so
+        # "rooms with capacity >= N" is a bisect on this list.
+        room_max_capacity = [
+            max((details['capacity'] for details in parsed_rooms[name].values()), default=None)
+            for name in self.room_names
+        ]
+        by_capacity = sorted(
+            (capacity, room_id) for room_id, capacity in enumerate(room_max_capacity)
+            if capacity is not None
+        )
+        self.room_max_capacity = room_max_capacity
+        self._sorted_capacities = [capacity for capacity, _ in by_capacity]
+        self._room_ids_by_capacity = [room_id for _, room_id in by_capacity]
+        self._room_ids_cache = {}
+
+    def specialized_instructor_ids(self, specialization):
+        """Ids of instructors listing the specialization, in parsed order."""
+        return self.instructor_ids_by_spec.get(specialization, [])
+
+    def specialized_instructors(self, specialization):
+        """Names of instructors listing the specialization, in parsed order."""
+        return [self.instructor_names[i] for i in self.specialized_instructor_ids(specialization)]
+
+    def room_ids_with_capacity(self, num_students):
+        """Ids of rooms seating num_students in at least one slot, in parsed order."""
+        room_ids = self._room_ids_cache.get(num_students)
+        if room_ids is None:
+            cut = bisect_left(self._sorted_capacities, num_students)
+            room_ids = sorted(self._room_ids_by_capacity[cut:])
+            self._room_ids_cache[num_students] = room_ids
+        return room_ids
+
+    def rooms_with_capacity(self, num_students):
+        """Names of rooms seating num_students in at least one slot, in parsed order."""
+        return [self.room_names[i] for i in self.room_ids_with_capacity(num_students)]
+
+
+def build_scheduling_index(parsed_instructors, parsed_rooms):
+    """Build the SchedulingIndex, or None when either parsed dataset is missing."""
+    if parsed_instructors is None or parsed_rooms is None:
+        return None
+    return SchedulingIndex(parsed_instructors, parsed_rooms)
@@ -0,0 +1,111 @@
+"""Compare the bulk CSV parsers in scheduler.data with the original row-by-row versions."""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from scheduler.data import DEFAULT_INPUT_FILES, process_instructor_data, process_room_data
+from scheduler.synthetic import generate_dataset
+
+DEFAULT_SCALES = (1, 10, 50)
+DEFAULT_REPEATS = 3
+
+
+def process_instructor_data_rowwise(raw_df):
+    """The iterrows implementation process_instructor_data replaced, kept as the reference."""
+    if raw_df is None: return None
+    parsed_instructors = {}
+    for _, row in raw_df.iterrows():
+        instructor_name = row['Instructor']
+        day = row['Day']; time_slot = row['Time Slot']; specialization = row['Specialization']
+        if instructor_name not in parsed_instructors:
+            parsed_instructors[instructor_name] = {'availability': [], 'specializations': set()}
+        parsed_instructors[instructor_name]['availability'].append((day, time_slot))
+        parsed_instructors[instructor_name]['specializations'].add(specialization)
+    return parsed_instructors
+
+
+def process_room_data_rowwise(raw_df):
+    """The iterrows implementation process_room_data replaced, kept as the reference."""
+    if raw_df is None: return None
+    parsed_rooms = {}
+    for _, row in raw_df.iterrows():
+        room_name = row['Room']; day = row['Day']; time_slot = row['Time Slot']; capacity = row['Max Capacity']
+        if room_name not in parsed_rooms: parsed_rooms[room_name] = {}
+        parsed_rooms[room_name][(day, time_slot)] = {'capacity': int(capacity), 'is_available': True}
+    return parsed_rooms
+
+
+# parser name -> (input table, reference implementation, current implementation)
+PARSERS = {
+    'process_instructor_data': ('instructors', process_instructor_data_rowwise, process_instructor_data),
+    'process_room_data': ('rooms', process_room_data_rowwise, process_room_data),
+}
+
+
+def _best_time(fn, arg, repeats):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def _same_output(expected, actual):
+    """Equal contents and equal key order at both levels, which the UI's listings depend on."""
+    return expected == actual and list(expected) == list(actual) and all(
+        list(expected[key]) == list(actual[key]) for key in expected)
+
+
+def compare_parsers(frames, repeats=DEFAULT_REPEATS, label=''):
+    """
+    Time each parser against its row-by-row reference on the given tables.
+
+    Returns:
+        list: One dict per parser with 'dataset', 'parser', 'rows',
+              'rowwise_s', 'bulk_s', 'speedup' and 'same_output'.
+    """
+    rows = []
+    for parser_name, (table, reference, current) in PARSERS.items():
+        raw_df = frames[table]
+        expected, rowwise_s = _best_time(reference, raw_df, repeats)
+        actual, bulk_s = _best_time(current, raw_df, repeats)
+        rows.append({'dataset': label, 'parser': parser_name, 'rows': len(raw_df), 'rowwise_s': rowwise_s,
+                     'bulk_s': bulk_s, 'speedup': rowwise_s / bulk_s if bulk_s else None,
+                     'same_output': _same_output(expected, actual)})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m scheduler.ingest_benchmark',
+        description="Time the bulk instructor/room parsers against the original iterrows versions.")
+    parser.add_argument('--scales', type=float, nargs='+', default=list(DEFAULT_SCALES),
+                        help="Synthetic dataset scales to run (default: 1 10 50)")
+    parser.add_argument('--data-dir', action='append', default=[],
+                        help="Benchmark an existing dataset directory instead (repeatable)")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help=f"Runs per parser; the best time is reported (default: {DEFAULT_REPEATS})")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for data_dir in args.data_dir:
+        frames = {table: pd.read_csv(os.path.join(data_dir, DEFAULT_INPUT_FILES[table]))
+                  for table in ('instructors', 'rooms')}
+        rows += compare_parsers(frames, args.repeats, label=data_dir)
+    if not args.data_dir:
+        for scale in args.scales:
+            rows += compare_parsers(generate_dataset(scale, seed=args.seed), args.repeats,
+                                    label=f"synthetic x{scale:g}")
+
+    results = pd.DataFrame(rows)
+    with pd.option_context('display.width', 200, 'display.float_format', '{:.4f}'.format):
+        print(results.to_string(index=False))
+    return 0 if results['same_output'].all() else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
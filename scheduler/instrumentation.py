@@ -0,0 +1,139 @@
+"""Per-phase wall time, CPU time and peak allocation, a JSONL run log and cProfile captures."""
+import cProfile
+import io
+import json
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_RUN_LOG = os.environ.get('INSYNC_RUN_LOG', os.path.join(tempfile.gettempdir(), 'insync_run_log.jsonl'))
+DEFAULT_PROFILE_TOP_N = 40
+
+
+class PhaseRecorder:
+    """
+    Collects one record per pipeline phase run inside ``with recorder.phase(name):``.
+
+    Each record holds the phase name, wall seconds, CPU seconds of this process
+    (worker processes, e.g. the multi-start pool, are not included) and, when
+    trace_memory is set, the peak Python allocation above the phase's starting
+    point as measured by tracemalloc. Tracing is started for the phase and
+    stopped after it unless something else was already tracing, so phases
+    should not be nested.
+    """
+
+    def __init__(self, trace_memory=True, phases=None):
+        self.trace_memory = trace_memory
+        self.phases = list(phases or [])
+
+    @contextmanager
+    def phase(self, name):
+        started_tracing = False
+        baseline = 0
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                'phase': name,
+                'wall_s': time.perf_counter() - wall_start,
+                'cpu_s': time.process_time() - cpu_start,
+                'peak_mb': None,
+            }
+            if self.trace_memory:
+                record['peak_mb'] = max(tracemalloc.get_traced_memory()[1] - baseline, 0) / (1024 * 1024)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.phases.append(record)
+
+    def total_wall(self):
+        return sum(record['wall_s'] for record in self.phases)
+
+
+def append_run_log(entry, path=DEFAULT_RUN_LOG):
+    """Append one timestamped JSON line to the run log; failures are printed, never raised."""
+    line = dict(entry, timestamp=datetime.now().isoformat(timespec='seconds'))
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line, default=str) + '\n')
+    except OSError as e:
+        print(f"Run log write skipped: {e}")
+
+
+class ProfileCapture:
+    """
+    One cProfile capture: the raw .prof bytes (loadable with pstats or
+    snakeviz) and the top functions by cumulative time.
+
+    Only the calling thread is profiled; work done in worker processes, such
+    as the multi-start pool, shows up as time spent waiting on the pool.
+    """
+
+    def __init__(self, label, top_n=DEFAULT_PROFILE_TOP_N):
+        self.label = label
+        self.top_n = top_n
+        self.created_at = datetime.now()
+        self.prof_bytes = None
+        self.top_functions = []
+        self.total_time = 0.0
+
+    def load(self, profiler):
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        self.total_time = stats.total_tt
+        fd, path = tempfile.mkstemp(suffix='.prof')
+        os.close(fd)
+        try:
+            stats.dump_stats(path)
+            with open(path, 'rb') as f:
+                self.prof_bytes = f.read()
+        finally:
+            os.remove(path)
+
+        rows = []
+        for (file_name, line, function), (prim_calls, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                'function': function if file_name == '~' else f"{os.path.basename(file_name)}:{line}({function})",
+                'calls': calls if calls == prim_calls else f"{calls}/{prim_calls}",
+                'tottime_s': tottime,
+                'cumtime_s': cumtime,
+            })
+        rows.sort(key=lambda row: row['cumtime_s'], reverse=True)
+        self.top_functions = rows[:self.top_n]
+
+    @property
+    def file_stem(self):
+        return f"profile_{self.label}_{self.created_at.strftime('%Y%m%d_%H%M%S')}"
+
+
+@contextmanager
+def profiled(label, enabled=True, top_n=DEFAULT_PROFILE_TOP_N):
+    """
+    Run the block under cProfile when enabled and yield the ProfileCapture,
+    filled in once the block exits; with enabled=False the capture stays
+    empty (prof_bytes is None) and nothing is profiled.
+    """
+    capture = ProfileCapture(label, top_n)
+    if not enabled:
+        yield capture
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield capture
+    finally:
+        profiler.disable()
+        capture.load(profiler)
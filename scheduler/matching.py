@@ -0,0 +1,90 @@
+"""Bipartite matching helpers shared by the engines and post-passes."""
+from collections import deque
+
+import numpy as np
+
+_UNMATCHED = -1
+
+
+def hopcroft_karp(adjacency, n_right):
+    """
+    Maximum bipartite matching by Hopcroft–Karp, O(E sqrt(V)).
+
+    adjacency[u] lists the right vertices left vertex u may take, in order of
+    preference; with several maximum matchings, earlier entries tend to win.
+
+    Returns:
+        list: match[u] is the right vertex matched to u, or -1.
+    """
+    n_left = len(adjacency)
+    match_left = [_UNMATCHED] * n_left
+    match_right = [_UNMATCHED] * n_right
+
+    while True:
+        # BFS from the free left vertices layers the graph by alternating paths
+        layer = [_UNMATCHED] * n_left
+        queue = deque()
+        for u in range(n_left):
+            if match_left[u] == _UNMATCHED:
+                layer[u] = 0
+                queue.append(u)
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in adjacency[u]:
+                w = match_right[v]
+                if w == _UNMATCHED:
+                    found = True
+                elif layer[w] == _UNMATCHED:
+                    layer[w] = layer[u] + 1
+                    queue.append(w)
+        if not found:
+            return match_left
+
+        # DFS along the layers, augmenting vertex-disjoint shortest paths
+        next_edge = [0] * n_left
+        for root in range(n_left):
+            if match_left[root] != _UNMATCHED:
+                continue
+            path = [root]
+            while path:
+                u = path[-1]
+                if next_edge[u] == len(adjacency[u]):
+                    layer[u] = _UNMATCHED  # dead end for the rest of this phase
+                    path.pop()
+                    continue
+                v = adjacency[u][next_edge[u]]
+                next_edge[u] += 1
+                w = match_right[v]
+                if w == _UNMATCHED:
+                    # Flip the path: each left vertex on it takes the edge it last tried
+                    for x in reversed(path):
+                        v_x = adjacency[x][next_edge[x] - 1]
+                        match_left[x], match_right[v_x] = v_x, x
+                    break
+                if layer[w] == layer[u] + 1:
+                    path.append(w)
+
+
+def assign_rooms_best_fit(capacities, sizes):
+    """
+    Give each class a distinct room in one cell, largest class first, smallest fitting room.
+
+    Room fit is nested by capacity (a room seating N also seats fewer), so this
+    greedy places as many classes as any matching can, and no other assignment
+    of the same classes uses fewer seats. capacities is indexed by room id, with
+    -1 for rooms not offered in the cell; ties keep the lower room id.
+
+    Returns:
+        list: Room id per class in sizes, or -1 where no free room fits.
+    """
+    capacities = np.asarray(capacities)
+    order = np.argsort(capacities, kind='stable')
+    free = [r for r in order.tolist() if capacities[r] >= 0]
+    rooms = [_UNMATCHED] * len(sizes)
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i]):
+        room = next((r for r in free if capacities[r] >= sizes[i]), _UNMATCHED)
+        if room != _UNMATCHED:
+            free.remove(room)
+        rooms[i] = room
+    return rooms
@@ -0,0 +1,225 @@
+"""Exact 0/1 integer-programming engine solved with SciPy's MILP (HiGHS)."""
+import time
+
+import numpy as np
+
+from scheduler.indexes import SchedulingIndex
+from scheduler.matching import assign_rooms_best_fit
+from scheduler.occupancy import (
+    NO_COMMON_SLOT_REASON, OccupancyGrid, schedule_entry, sort_classes_by_size,
+    static_unscheduled_reason, unscheduled_conflict,
+)
+
+DEFAULT_TIME_LIMIT = 60.0
+DEFAULT_MAX_VARIABLES = 150_000
+
+
+class ModelTooLargeError(ValueError):
+    """The exact model would exceed the variable budget for this dataset."""
+
+
+class MilpModel:
+    """
+    Maximize scheduled classes as a 0/1 program over feasible (class, instructor, cell) triples.
+
+    Variables exist only where the instructor holds the class's specialization,
+    is available at the cell, and some room at the cell seats the section, so
+    specialization and availability are enforced by construction. Rows (all
+    bounded above): one per class, one per (instructor, cell) and (section, cell)
+    that any variable touches, and one per (cell, capacity level).
+
+    Rooms are not variables. Rooms seating a head count are nested (a room that
+    seats N also seats fewer), so by Hall's theorem a cell's classes can be
+    given distinct rooms iff, for every capacity level K, the classes needing at
+    least K seats number no more than the rooms offering at least K. Those
+    level rows keep the model exact while cutting it by roughly the number of
+    rooms; rooms are then handed out per cell with assign_rooms_best_fit.
+
+    Classes with the same required specialization and head count share one
+    candidate template, and the constraint matrix is assembled in a single
+    COO construction.
+    """
+
+    def __init__(self, classes_to_schedule, parsed_instructors, parsed_rooms, index=None):
+        if index is None:
+            index = SchedulingIndex(parsed_instructors, parsed_rooms)
+        self.grid = grid = OccupancyGrid(parsed_instructors, parsed_rooms)
+
+        self.conflicts = []
+        self.classes = []
+        for class_info in sort_classes_by_size(classes_to_schedule):
+            reason = static_unscheduled_reason(index, class_info)
+            if reason:
+                self.conflicts.append(unscheduled_conflict(class_info, reason))
+            else:
+                self.classes.append(class_info)
+
+        # Distinct capacity levels and, per cell, how many rooms reach each one
+        capacities = grid.room_capacity
+        self.levels = np.unique(capacities[capacities >= 0])
+        self.rooms_at_level = (capacities[:, :, None] >= self.levels[None, None, :]).sum(axis=0)
+
+        # Deduplicated (instructor, cell) availability pairs
+        avail_instr = np.fromiter(
+            (i for i, cells in enumerate(grid.instructor_cells) for _ in cells), dtype=np.int64)
+        avail_cell = np.fromiter(
+            (c for cells in grid.instructor_cells for c in cells), dtype=np.int64)
+        pairs = np.unique(np.stack([avail_instr, avail_cell], axis=1), axis=0)
+
+        n_instructors = len(grid.instructor_names)
+        templates = {}
+        class_parts, instr_parts, cell_parts = [], [], []
+        self.class_level = np.searchsorted(self.levels, [c['section_students'] for c in self.classes])
+        for k, class_info in enumerate(self.classes):
+            key = (class_info['required_specialization'], class_info['section_students'])
+            if key not in templates:
+                spec_mask = np.zeros(n_instructors, dtype=bool)
+                spec_mask[index.specialized_instructor_ids(key[0])] = True
+                keep = spec_mask[pairs[:, 0]] & (self.rooms_at_level[pairs[:, 1], self.class_level[k]] > 0)
+                templates[key] = pairs[keep]
+            template = templates[key]
+            class_parts.append(np.full(len(template), k, dtype=np.int64))
+            instr_parts.append(template[:, 0])
+            cell_parts.append(template[:, 1])
+
+        def _concat(parts):
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+        self.var_class = _concat(class_parts)
+        self.var_instructor = _concat(instr_parts)
+        self.var_cell = _concat(cell_parts)
+        section_of_class = np.array([grid.section_id(c['section_name']) for c in self.classes], dtype=np.int64)
+        self.var_section = section_of_class[self.var_class]
+        self.var_level = self.class_level[self.var_class] if len(self.classes) else self.var_class
+        self.n_variables = len(self.var_class)
+
+    def constraints(self):
+        """Sparse CSR constraint matrix and its row upper bounds."""
+        from scipy.sparse import coo_matrix
+
+        n_cells = max(len(self.grid.cells), 1)
+        n_levels = max(len(self.levels), 1)
+        columns = np.arange(self.n_variables)
+        row_blocks, col_blocks, upper_blocks = [self.var_class], [columns], [np.ones(len(self.classes))]
+        offset = len(self.classes)
+
+        for resource in (self.var_instructor, self.var_section):
+            _, rows = np.unique(resource * n_cells + self.var_cell, return_inverse=True)
+            rows = rows.reshape(-1)
+            n_rows = int(rows.max()) + 1 if len(rows) else 0
+            row_blocks.append(rows + offset)
+            col_blocks.append(columns)
+            upper_blocks.append(np.ones(n_rows))
+            offset += n_rows
+
+        # A variable at level L counts against its cell's rows for levels 0..L
+        repeats = self.var_level + 1
+        level_cols = np.repeat(columns, repeats)
+        level_ids = np.arange(int(repeats.sum())) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        level_keys, rows = np.unique(self.var_cell[level_cols] * n_levels + level_ids, return_inverse=True)
+        rows = rows.reshape(-1)
+        row_blocks.append(rows + offset)
+        col_blocks.append(level_cols)
+        upper_blocks.append(self.rooms_at_level[level_keys // n_levels, level_keys % n_levels].astype(np.float64))
+        offset += len(level_keys)
+
+        rows = np.concatenate(row_blocks)
+        cols = np.concatenate(col_blocks)
+        data = np.ones(len(rows), dtype=np.float64)
+        matrix = coo_matrix((data, (rows, cols)), shape=(offset, self.n_variables)).tocsr()
+        return matrix, np.concatenate(upper_blocks)
+
+    def _assign_rooms(self, chosen):
+        """Give each chosen (class, instructor, cell) a room, best fit per cell."""
+        by_cell = {}
+        for v in chosen:
+            by_cell.setdefault(int(self.var_cell[v]), []).append(v)
+        rooms = {}
+        for cell, variables in by_cell.items():
+            sizes = [self.classes[self.var_class[v]]['section_students'] for v in variables]
+            # The level rows guarantee every chosen class gets a room
+            for v, room in zip(variables, assign_rooms_best_fit(self.grid.room_capacity[:, cell], sizes)):
+                rooms[int(self.var_class[v])] = (v, room)
+        return rooms
+
+    def solve(self, time_limit=DEFAULT_TIME_LIMIT, mip_rel_gap=0.0):
+        """
+        Solve with scipy.optimize.milp.
+
+        Returns:
+            tuple: (generated_schedule, conflicts, stats); stats include
+                   'build_time', 'solve_time', 'gap', 'status' and model sizes.
+                   When the time limit hits, the best incumbent is returned.
+        """
+        from scipy.optimize import Bounds, LinearConstraint, milp
+
+        build_start = time.perf_counter()
+        matrix, upper = self.constraints()
+        build_time = time.perf_counter() - build_start
+
+        solve_start = time.perf_counter()
+        chosen = []
+        status, gap, upper_bound = 'No feasible variables.', 0.0, 0
+        if self.n_variables:
+            result = milp(
+                c=-np.ones(self.n_variables),
+                constraints=LinearConstraint(matrix, -np.inf, upper),
+                integrality=np.ones(self.n_variables),
+                bounds=Bounds(0, 1),
+                options={'time_limit': time_limit, 'mip_rel_gap': mip_rel_gap},
+            )
+            status = result.message
+            if result.x is not None:
+                chosen = np.flatnonzero(result.x > 0.5).tolist()
+            gap = getattr(result, 'mip_gap', None)
+            dual_bound = getattr(result, 'mip_dual_bound', None)
+            upper_bound = min(int(np.floor(-dual_bound + 1e-6)), len(self.classes)) if dual_bound is not None else None
+        solve_time = time.perf_counter() - solve_start
+
+        placed = self._assign_rooms(chosen)
+        generated_schedule = []
+        conflicts = list(self.conflicts)
+        for k, class_info in enumerate(self.classes):
+            if k in placed:
+                v, room = placed[k]
+                generated_schedule.append(schedule_entry(
+                    self.grid, class_info, int(self.var_instructor[v]), room, int(self.var_cell[v])))
+            else:
+                conflicts.append(unscheduled_conflict(class_info, NO_COMMON_SLOT_REASON))
+
+        stats = {
+            'status': status,
+            'variables': self.n_variables,
+            'constraints': matrix.shape[0],
+            'build_time': build_time,
+            'solve_time': solve_time,
+            'gap': gap,
+            'upper_bound': upper_bound,
+        }
+        return generated_schedule, conflicts, stats
+
+
+def generate_schedule_milp(classes_to_schedule, parsed_instructors, parsed_rooms, index=None,
+                           time_limit=DEFAULT_TIME_LIMIT, mip_rel_gap=0.0, max_variables=DEFAULT_MAX_VARIABLES):
+    """
+    Build and solve the MILP model; returns (generated_schedule, conflicts, stats).
+
+    Raises:
+        ModelTooLargeError: if the model would exceed max_variables; use a
+                            heuristic engine for datasets that large.
+        ImportError: if SciPy is not installed.
+    """
+    try:
+        import scipy.optimize  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The exact MILP engine needs SciPy (pip install scipy).") from e
+    model_start = time.perf_counter()
+    model = MilpModel(classes_to_schedule, parsed_instructors, parsed_rooms, index)
+    variables_time = time.perf_counter() - model_start
+    if model.n_variables > max_variables:
+        raise ModelTooLargeError(
+            f"Exact model needs {model.n_variables:,} variables (limit {max_variables:,}). "
+            f"Use a heuristic engine for this dataset size.")
+    generated_schedule, conflicts, stats = model.solve(time_limit=time_limit, mip_rel_gap=mip_rel_gap)
+    stats['build_time'] += variables_time
+    return generated_schedule, conflicts, stats
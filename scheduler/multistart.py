@@ -0,0 +1,87 @@
+"""Parallel multi-start randomized greedy over a process pool."""
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from scheduler.indexes import SchedulingIndex
+from scheduler.occupancy import generate_schedule_bitset
+
+DEFAULT_STARTS = 8
+
+# Per-worker copy of the problem, sent once through the pool initializer
+# instead of being pickled with every task.
+_worker_problem = None
+
+
+def _init_worker(classes_to_schedule, parsed_instructors, parsed_rooms):
+    global _worker_problem
+    index = SchedulingIndex(parsed_instructors, parsed_rooms)
+    _worker_problem = (classes_to_schedule, parsed_instructors, parsed_rooms, index)
+
+
+def _run_start(seed):
+    """Run one greedy start; seed None is the deterministic greedy."""
+    classes_to_schedule, parsed_instructors, parsed_rooms, index = _worker_problem
+    rng = None if seed is None else random.Random(seed)
+    schedule, conflicts = generate_schedule_bitset(
+        classes_to_schedule, parsed_instructors, parsed_rooms, index, rng=rng)
+    return seed, schedule, conflicts
+
+
+def _unscheduled_count(conflicts):
+    return sum(1 for c in conflicts if c['type'] == 'Unscheduled Class')
+
+
+def generate_schedule_multistart(classes_to_schedule, parsed_instructors, parsed_rooms, index=None,
+                                 n_starts=DEFAULT_STARTS, max_workers=None, seed=None):
+    """
+    Run n_starts randomized greedy variants in parallel and keep the best.
+
+    The first start is always the deterministic greedy, so the result is never
+    worse than the bitset engine. The others use seeds seed+1 .. seed+n_starts-1
+    (a random base seed when seed is None). The kept result has the fewest
+    'Unscheduled Class' conflicts, ties going to the earliest start. Falls back
+    to running the starts in-process when a worker pool cannot be started.
+
+    Returns:
+        tuple: (generated_schedule, conflicts, stats)
+    """
+    start = time.perf_counter()
+    n_starts = max(1, int(n_starts))
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+    seeds = [None] + [seed + i for i in range(1, n_starts)]
+    if max_workers is None:
+        max_workers = min(n_starts, os.cpu_count() or 1)
+
+    problem = (classes_to_schedule, parsed_instructors, parsed_rooms)
+    results = None
+    if max_workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=problem) as executor:
+                results = list(executor.map(_run_start, seeds))
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Process pool unavailable ({e}). Running starts sequentially.")
+    if results is None:
+        global _worker_problem
+        _worker_problem = problem + (index or SchedulingIndex(parsed_instructors, parsed_rooms),)
+        try:
+            results = [_run_start(s) for s in seeds]
+        finally:
+            _worker_problem = None
+
+    unscheduled = [_unscheduled_count(conflicts) for _, _, conflicts in results]
+    best = min(range(len(results)), key=lambda i: unscheduled[i])
+    best_seed, generated_schedule, conflicts = results[best]
+
+    stats = {
+        'starts': len(results),
+        'workers': max_workers,
+        'best_seed': best_seed,
+        'unscheduled_per_start': unscheduled,
+        'solve_time': time.perf_counter() - start,
+    }
+    return generated_schedule, conflicts, stats
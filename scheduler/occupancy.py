@@ -0,0 +1,235 @@
+"""Integer-interned occupancy tracking and the bitset greedy engine."""
+from itertools import groupby
+
+import numpy as np
+
+from scheduler.indexes import SchedulingIndex
+
+
+class OccupancyGrid:
+    """
+    Interns instructors, rooms, sections and (day, time slot) cells to integer ids.
+
+    Busy state is kept as one Python int bitmask per entity (bit ``c`` set means
+    cell ``c`` is taken), so a feasibility test is a single AND instead of
+    several tuple hashes. Room capacities live in a NumPy matrix (rooms x cells)
+    so "which cells of which rooms seat N students" is one vectorized compare.
+    """
+
+    def __init__(self, parsed_instructors, parsed_rooms):
+        self.cell_ids = {}
+        self.cells = []
+
+        self.instructor_names = list(parsed_instructors)
+        self.instructor_ids = {name: i for i, name in enumerate(self.instructor_names)}
+        self.room_names = list(parsed_rooms)
+        self.room_ids = {name: i for i, name in enumerate(self.room_names)}
+        self.section_names = []
+        self.section_ids = {}
+
+        # Availability cells are kept in their original order so the bitset
+        # engine makes exactly the same choices as the standard greedy.
+        self.instructor_cells = []
+        self.instructor_avail = []
+        for name in self.instructor_names:
+            cells = [self.cell_id(day, time_slot)
+                     for day, time_slot in parsed_instructors[name]['availability']]
+            mask = 0
+            for cell in cells:
+                mask |= 1 << cell
+            self.instructor_cells.append(cells)
+            self.instructor_avail.append(mask)
+
+        room_entries = [
+            (self.room_ids[room_name], self.cell_id(day, time_slot), details['capacity'])
+            for room_name, room_slots in parsed_rooms.items()
+            for (day, time_slot), details in room_slots.items()
+        ]
+        # -1 marks cells where the room is not offered at all
+        self.room_capacity = np.full((len(self.room_names), len(self.cells)), -1, dtype=np.int64)
+        if room_entries:
+            room_idx, cell_idx, capacities = zip(*room_entries)
+            self.room_capacity[list(room_idx), list(cell_idx)] = capacities
+
+        self.instructor_busy = [0] * len(self.instructor_names)
+        self.room_busy = [0] * len(self.room_names)
+        self.section_busy = []
+        self._fit_cache = {}
+
+    def cell_id(self, day, time_slot):
+        """Return the integer id of a (day, time slot) cell, interning it if new."""
+        key = (day, time_slot)
+        cell = self.cell_ids.get(key)
+        if cell is None:
+            cell = len(self.cells)
+            self.cell_ids[key] = cell
+            self.cells.append(key)
+        return cell
+
+    def section_id(self, section_name):
+        """Return the integer id of a section, interning it if new."""
+        section = self.section_ids.get(section_name)
+        if section is None:
+            section = len(self.section_names)
+            self.section_ids[section_name] = section
+            self.section_names.append(section_name)
+            self.section_busy.append(0)
+        return section
+
+    def fit_masks(self, num_students):
+        """Per-room bitmask of the cells whose capacity seats num_students (cached per head count)."""
+        masks = self._fit_cache.get(num_students)
+        if masks is None:
+            if self.cells:
+                packed = np.packbits(self.room_capacity >= num_students, axis=1, bitorder='little')
+                masks = [int.from_bytes(row.tobytes(), 'little') for row in packed]
+            else:
+                masks = [0] * len(self.room_names)
+            self._fit_cache[num_students] = masks
+        return masks
+
+    def book(self, instructor, room, section, cell):
+        """Mark the cell busy for the given instructor, room and section ids."""
+        bit = 1 << cell
+        self.instructor_busy[instructor] |= bit
+        self.room_busy[room] |= bit
+        self.section_busy[section] |= bit
+
+    def release(self, instructor, room, section, cell):
+        """Undo a book() of the same cell for the given ids."""
+        bit = ~(1 << cell)
+        self.instructor_busy[instructor] &= bit
+        self.room_busy[room] &= bit
+        self.section_busy[section] &= bit
+
+
+NO_COMMON_SLOT_REASON = 'No common available time slot found for teacher, room, and section.'
+
+
+def sort_classes_by_size(classes_to_schedule):
+    """Largest sections first, the order every engine places classes in."""
+    try:
+        return sorted(
+            classes_to_schedule,
+            key=lambda x: x.get('section_students', 0),
+            reverse=True
+        )
+    except Exception as e:
+        print(f"Error sorting classes: {e}. Using original order.")
+        return list(classes_to_schedule)
+
+
+def shuffle_equal_sizes(sorted_classes, rng):
+    """Shuffle classes within each run of equal section size, keeping largest-first order."""
+    shuffled = []
+    for _, group in groupby(sorted_classes, key=lambda x: x.get('section_students', 0)):
+        group = list(group)
+        rng.shuffle(group)
+        shuffled.extend(group)
+    return shuffled
+
+
+def unscheduled_conflict(class_info, reason):
+    """Build the 'Unscheduled Class' conflict record the UI consumes."""
+    return {
+        'type': 'Unscheduled Class',
+        'section': class_info['section_name'],
+        'subject': class_info['subject_code'],
+        'students': class_info['section_students'],
+        'required_specialization': class_info['required_specialization'],
+        'reason': reason
+    }
+
+
+def static_unscheduled_reason(index, class_info):
+    """Reason a class can never be placed (no qualified teacher or big enough room), else None."""
+    required_spec = class_info['required_specialization']
+    num_students = class_info['section_students']
+    if not index.specialized_instructor_ids(required_spec):
+        return f"No teachers found with specialization: {required_spec}."
+    if not index.room_ids_with_capacity(num_students):
+        return f"No rooms found with capacity >= {num_students} students."
+    return None
+
+
+def schedule_entry(grid, class_info, instructor, room, cell):
+    """Build a generated_schedule row for a class placed at (instructor, room, cell) ids."""
+    day, time_slot = grid.cells[cell]
+    return {
+        'Section': class_info['section_name'],
+        'Subject Code': class_info['subject_code'],
+        'Subject Name': class_info['subject_name'],
+        'Instructor': grid.instructor_names[instructor],
+        'Room': grid.room_names[room],
+        'Day': day,
+        'Time Slot': time_slot,
+        'Students': class_info['section_students'],
+        'Room Capacity': int(grid.room_capacity[room, cell])
+    }
+
+
+def generate_schedule_bitset(classes_to_schedule, parsed_instructors, parsed_rooms, index=None, rng=None):
+    """
+    Greedy placement equivalent to the standard engine, run on an OccupancyGrid.
+
+    The parsed dicts are only read, never copied or mutated. index is a
+    SchedulingIndex for the same data; one is built when not supplied.
+    rng (a random.Random) randomizes tie-breaking among equal-size classes and
+    the order candidate instructors and rooms are tried in; without it the
+    placement is deterministic.
+
+    Returns:
+        tuple: (generated_schedule, conflicts) in the same shape as the standard engine.
+    """
+    if index is None:
+        index = SchedulingIndex(parsed_instructors, parsed_rooms)
+    grid = OccupancyGrid(parsed_instructors, parsed_rooms)
+    generated_schedule = []
+    conflicts = []
+
+    sorted_classes = sort_classes_by_size(classes_to_schedule)
+    if rng is not None:
+        sorted_classes = shuffle_equal_sizes(sorted_classes, rng)
+
+    for class_info in sorted_classes:
+        reason = static_unscheduled_reason(index, class_info)
+        if reason:
+            conflicts.append(unscheduled_conflict(class_info, reason))
+            continue
+
+        num_students = class_info['section_students']
+        specialized_teachers = index.specialized_instructor_ids(class_info['required_specialization'])
+        suitable_rooms = index.room_ids_with_capacity(num_students)
+        if rng is not None:
+            specialized_teachers = rng.sample(specialized_teachers, len(specialized_teachers))
+            suitable_rooms = rng.sample(suitable_rooms, len(suitable_rooms))
+        fit_masks = grid.fit_masks(num_students)
+        section = grid.section_id(class_info['section_name'])
+        open_rooms = [(room, fit_masks[room] & ~grid.room_busy[room]) for room in suitable_rooms]
+        any_room_open = 0
+        for _, mask in open_rooms:
+            any_room_open |= mask
+        section_open = any_room_open & ~grid.section_busy[section]
+
+        placement = None
+        for instructor in specialized_teachers:
+            candidates = grid.instructor_avail[instructor] & section_open & ~grid.instructor_busy[instructor]
+            if not candidates:
+                continue
+            for cell in grid.instructor_cells[instructor]:
+                if candidates >> cell & 1:
+                    room = next(room for room, mask in open_rooms if mask >> cell & 1)
+                    placement = (instructor, room, cell)
+                    break
+            if placement:
+                break
+
+        if placement is None:
+            conflicts.append(unscheduled_conflict(class_info, NO_COMMON_SLOT_REASON))
+            continue
+
+        instructor, room, cell = placement
+        grid.book(instructor, room, section, cell)
+        generated_schedule.append(schedule_entry(grid, class_info, instructor, room, cell))
+
+    return generated_schedule, conflicts
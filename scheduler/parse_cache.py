@@ -0,0 +1,127 @@
+"""In-memory cache of parsed uploads, keyed by the SHA-256 of the uploaded bytes."""
+import hashlib
+import io
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+DEFAULT_MAX_BYTES = int(os.environ.get('INSYNC_PARSE_CACHE_MB', 256)) * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 64
+
+
+def content_digest(data):
+    """SHA-256 hex digest of raw uploaded bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _approx_size(value):
+    """Deep memory of a DataFrame; for other values, their pickled size as a proxy."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return 0
+
+
+class ParseCache:
+    """
+    LRU cache of parsed CSVs and the structures derived from them, shared by
+    every session in the process.
+
+    Raw tables are keyed by the digest of the uploaded bytes; derived values
+    (parsed instructors, parsed rooms, the class list) by their kind plus the
+    digests of the tables they were computed from. Entries are evicted least
+    recently used first once max_bytes or max_entries is exceeded; a single
+    value larger than max_bytes is returned but not kept.
+
+    Cached values are handed out as the same objects to every caller, so they
+    must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for key, computing and storing it on a miss.
+
+        Returns:
+            tuple: (value, hit). Two sessions missing on the same key at once
+                   may both compute it; the later result is kept.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0], True
+            self.misses += 1
+        value = compute()
+        size = _approx_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+        return value, False
+
+    def read_csv(self, data, table=None, convert=None):
+        """
+        DataFrame for the uploaded CSV bytes, passed through convert (e.g. a
+        dtype encoding for the named table) before it is cached.
+
+        Returns:
+            tuple: (DataFrame, digest of the bytes, hit)
+        """
+        digest = content_digest(data)
+
+        def parse():
+            df = pd.read_csv(io.BytesIO(data))
+            return convert(df) if convert is not None else df
+        df, hit = self.get_or_compute(('csv', table, digest), parse)
+        return df, digest, hit
+
+    def derived(self, kind, digests, compute):
+        """
+        Value computed from the tables with the given digests, cached under
+        (kind, *digests). When any digest is unknown (None) the value is
+        computed without caching.
+
+        Returns:
+            tuple: (value, hit)
+        """
+        if any(digest is None for digest in digests):
+            return compute(), False
+        return self.get_or_compute((kind, *digests), compute)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+_default_cache = None
+
+
+def default_parse_cache():
+    """Process-wide ParseCache shared by all sessions."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+    return _default_cache
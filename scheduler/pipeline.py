@@ -0,0 +1,228 @@
+"""Headless scheduling pipeline: engine dispatch, post-passes and verification."""
+import pandas as pd
+
+from scheduler.annealing import improve_schedule_annealing
+from scheduler.backtracking import generate_schedule_backtracking
+from scheduler.decomposition import generate_schedule_decomposition
+from scheduler.indexes import build_scheduling_index
+from scheduler.milp import generate_schedule_milp
+from scheduler.multistart import generate_schedule_multistart
+from scheduler.occupancy import generate_schedule_bitset
+from scheduler.room_reassignment import reoptimize_rooms
+from scheduler.verification import find_double_bookings
+
+# Engine names accepted by generate_schedule_attempt
+ENGINES = ("bitset", "standard", "backtracking", "multistart", "decomposition", "milp")
+
+
+def _print_warning(message):
+    print(f"Warning: {message}")
+
+
+def greedy_schedule_standard(classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, index):
+    """Standard greedy placement tracking busy slots as (name, day, time slot) tuples."""
+    generated_schedule = []
+    conflicts = []
+    instructor_busy_slots = set()
+    section_busy_slots = set()
+    room_busy_slots = set()  # Enhanced: Track room busy slots
+    
+    # Sort by number of students (largest first)
+    try:
+        sorted_classes_to_schedule = sorted(
+            classes_to_schedule,
+            key=lambda x: x.get('section_students', 0), 
+            reverse=True
+        )
+    except Exception as e:
+        print(f"Error sorting classes: {e}. Using original order.")
+        sorted_classes_to_schedule = classes_to_schedule
+
+    for class_info in sorted_classes_to_schedule:
+        section_name = class_info['section_name']
+        subject_code = class_info['subject_code']
+        subject_name = class_info['subject_name']
+        required_spec = class_info['required_specialization']
+        num_students = class_info['section_students']
+
+        slot_assigned_for_this_class = False
+        
+        # Find specialized teachers
+        specialized_teachers = index.specialized_instructors(required_spec)
+        
+        if not specialized_teachers:
+            conflicts.append({
+                'type': 'Unscheduled Class', 
+                'section': section_name, 
+                'subject': subject_code,
+                'students': num_students, 
+                'required_specialization': required_spec,
+                'reason': f"No teachers found with specialization: {required_spec}."
+            })
+            continue
+
+        # Find suitable rooms
+        suitable_rooms_by_capacity = index.rooms_with_capacity(num_students)
+        
+        if not suitable_rooms_by_capacity:
+            conflicts.append({
+                'type': 'Unscheduled Class', 
+                'section': section_name, 
+                'subject': subject_code,
+                'students': num_students, 
+                'required_specialization': required_spec,
+                'reason': f"No rooms found with capacity >= {num_students} students."
+            })
+            continue
+
+        # Try to assign the class
+        for instructor_name in specialized_teachers:
+            if slot_assigned_for_this_class: 
+                break
+            
+            instr_details = parsed_instructors_orig[instructor_name]
+            
+            for day, time_slot in list(instr_details['availability']):
+                if slot_assigned_for_this_class: 
+                    break
+                
+                # Enhanced checks
+                if (instructor_name, day, time_slot) in instructor_busy_slots:
+                    continue
+                if (section_name, day, time_slot) in section_busy_slots:
+                    continue
+                
+                for room_name in suitable_rooms_by_capacity:
+                    if slot_assigned_for_this_class: 
+                        break
+                    
+                    # Check if room is busy at this time
+                    if (room_name, day, time_slot) in room_busy_slots:
+                        continue
+                    
+                    if (day, time_slot) in parsed_rooms_orig.get(room_name, {}):
+                        room_slot_details = parsed_rooms_orig[room_name][(day, time_slot)]
+                        
+                        if room_slot_details['capacity'] >= num_students:
+                            # Assign the class
+                            generated_schedule.append({
+                                'Section': section_name, 
+                                'Subject Code': subject_code, 
+                                'Subject Name': subject_name,
+                                'Instructor': instructor_name, 
+                                'Room': room_name, 
+                                'Day': day, 
+                                'Time Slot': time_slot,
+                                'Students': num_students, 
+                                'Room Capacity': room_slot_details['capacity']
+                            })
+                            
+                            # Mark slots as busy
+                            instructor_busy_slots.add((instructor_name, day, time_slot))
+                            section_busy_slots.add((section_name, day, time_slot))
+                            room_busy_slots.add((room_name, day, time_slot))
+                            
+                            slot_assigned_for_this_class = True
+                            break
+
+        if not slot_assigned_for_this_class:
+            conflicts.append({
+                'type': 'Unscheduled Class', 
+                'section': section_name, 
+                'subject': subject_code,
+                'students': num_students, 
+                'required_specialization': required_spec,
+                'reason': 'No common available time slot found for teacher, room, and section.'
+            })
+
+    return generated_schedule, conflicts
+
+
+def generate_schedule_attempt(classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, engine="bitset",
+                              index=None, solver_options=None, solver_stats=None, anneal_time_limit=None,
+                              optimize_rooms=False, on_warning=None):
+    """
+    Enhanced scheduling with better conflict prevention.
+
+    Runs without Streamlit: the app and the command line (python -m scheduler)
+    both call this.
+
+    engine selects the placement strategy: "bitset" runs the greedy on integer
+    bitmask occupancy (scheduler.occupancy), "standard" runs the tuple-set greedy.
+    Both make the same placement decisions; neither copies the parsed dicts.
+    "backtracking" runs the budgeted MRV search (scheduler.backtracking), which
+    can place classes the greedy gives up on. "multistart" runs randomized greedy
+    variants across a process pool and keeps the one with fewest unscheduled classes.
+    "milp" solves the exact integer program with SciPy's HiGHS (scheduler.milp);
+    it needs SciPy and is meant for a single department or a small college.
+    "decomposition" colors the class conflict graph with time slots, then matches
+    instructors and rooms per slot (scheduler.decomposition).
+    index is the SchedulingIndex for the parsed data; built here if not given.
+    solver_options are keyword arguments for the selected engine (e.g. node_limit,
+    time_limit, n_starts); solver_stats, if given, is a dict filled with engine statistics.
+    anneal_time_limit, if set, runs the simulated-annealing improvement pass
+    (scheduler.annealing) on the engine's result for that many seconds; its
+    statistics go to solver_stats['annealing']. optimize_rooms then re-assigns rooms
+    best fit within each day and time slot and retries unscheduled classes
+    (scheduler.room_reassignment); its statistics go to solver_stats['rooms'].
+    on_warning is called with a message when there is nothing to schedule (the
+    UI passes st.warning); by default it is printed.
+
+    Raises:
+        ValueError: for an unknown engine name.
+        ImportError, ModelTooLargeError: from the "milp" engine.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown scheduling engine {engine!r}; expected one of {', '.join(ENGINES)}.")
+    if not classes_to_schedule or not parsed_instructors_orig or not parsed_rooms_orig:
+        (on_warning or _print_warning)("Missing necessary data for scheduling.")
+        return [], []
+
+    if index is None:
+        index = build_scheduling_index(parsed_instructors_orig, parsed_rooms_orig)
+
+    solver_options = solver_options or {}
+    if engine == "bitset":
+        generated_schedule, conflicts = generate_schedule_bitset(
+            classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, index)
+    elif engine == "backtracking":
+        generated_schedule, conflicts, stats = generate_schedule_backtracking(
+            classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, index, **solver_options)
+        if solver_stats is not None:
+            solver_stats.update(stats)
+    elif engine == "multistart":
+        generated_schedule, conflicts, stats = generate_schedule_multistart(
+            classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, index, **solver_options)
+        if solver_stats is not None:
+            solver_stats.update(stats)
+    elif engine == "decomposition":
+        generated_schedule, conflicts, stats = generate_schedule_decomposition(
+            classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, index, **solver_options)
+        if solver_stats is not None:
+            solver_stats.update(stats)
+    elif engine == "milp":
+        generated_schedule, conflicts, stats = generate_schedule_milp(
+            classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, index, **solver_options)
+        if solver_stats is not None:
+            solver_stats.update(stats)
+    else:
+        generated_schedule, conflicts = greedy_schedule_standard(
+            classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, index)
+
+    if anneal_time_limit:
+        generated_schedule, conflicts, stats = improve_schedule_annealing(
+            generated_schedule, conflicts, classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig,
+            index, time_limit=anneal_time_limit)
+        if solver_stats is not None:
+            solver_stats['annealing'] = stats
+
+    if optimize_rooms:
+        generated_schedule, conflicts, stats = reoptimize_rooms(
+            generated_schedule, conflicts, classes_to_schedule, parsed_instructors_orig, parsed_rooms_orig, index)
+        if solver_stats is not None:
+            solver_stats['rooms'] = stats
+
+    # Verify no teacher, room or section double bookings in final schedule
+    conflicts.extend(find_double_bookings(pd.DataFrame(generated_schedule)))
+
+    return generated_schedule, conflicts
@@ -0,0 +1,47 @@
+"""Per-session LRU cache of rendered timetable HTML, keyed by schedule version and view."""
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 32
+
+
+class RenderCache:
+    """
+    Rendered HTML keyed by (schedule version, filter type, entity).
+
+    The version is a counter the caller bumps whenever the schedule changes,
+    so a key never refers to stale data. Entries from older versions are
+    dropped as soon as a newer version is seen; within a version the least
+    recently used entry goes once max_entries is exceeded.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get_or_render(self, version, view, render):
+        """
+        Cached HTML for (version, *view), calling render() on a miss.
+
+        Returns:
+            tuple: (html, hit)
+        """
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+        key = tuple(view)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key], True
+        self.misses += 1
+        html = render()
+        self._entries[key] = html
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return html, False
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,139 @@
+"""On-disk, content-addressed cache of schedule generation results."""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'INSYNC_RESULT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'insync_result_cache'))
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def dataframe_digest(df):
+    """SHA-256 of a DataFrame's columns, dtypes and cell values (index excluded)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def result_cache_key(dataframes, settings):
+    """
+    Stable key for a run: the input DataFrames plus the solver settings.
+
+    Returns None when any DataFrame is missing, since the result then cannot
+    be tied to its inputs.
+    """
+    if any(df is None for df in dataframes):
+        return None
+    digest = hashlib.sha256()
+    for df in dataframes:
+        digest.update(dataframe_digest(df).encode())
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+class ResultCache:
+    """
+    Size-capped LRU cache of JSON files, one per key, shared by every session on the host.
+
+    Recency is the file's modification time, bumped on every hit; writes go
+    through a temporary file and os.replace so concurrent readers never see a
+    partial entry. After each write the least recently used entries are
+    deleted until the directory is back under max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Cached value for key, or None on a miss or an unreadable entry."""
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def put(self, key, value):
+        """Store a JSON-serializable value under key, then evict down to the size cap."""
+        if key is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(value, f, default=_to_json)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                # Don't leave a half-written temp file behind in the cache directory
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Result cache write skipped: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # removed by another session meanwhile
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Delete every cached entry."""
+        if not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.json', '.tmp')):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+_default_cache = None
+
+
+def default_result_cache():
+    """The process-wide ResultCache at DEFAULT_CACHE_DIR, shared by all sessions."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
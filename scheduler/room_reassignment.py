@@ -0,0 +1,170 @@
+"""Per-slot room re-optimization over a finished schedule."""
+import time
+
+from scheduler.indexes import SchedulingIndex
+from scheduler.matching import assign_rooms_best_fit, hopcroft_karp
+from scheduler.occupancy import NO_COMMON_SLOT_REASON, OccupancyGrid, schedule_entry, unscheduled_conflict
+
+
+class RoomReassigner:
+    """
+    Re-solve class -> room within every (day, time slot), then retry unscheduled classes.
+
+    Engines pick rooms in parsed order, so a small section can hold the large
+    room a later, larger section needed. Within one cell a room seats a class
+    iff its capacity covers the head count, and those neighbourhoods are
+    nested, so assign_rooms_best_fit is a maximum matching that also wastes the
+    fewest seats. Instructors, days and time slots are left as they are.
+
+    The seats this frees are then offered to the 'Unscheduled Class' entries:
+    a class fits a cell when its section is free there, the cell's classes plus
+    it still pass best fit, and it gets a qualified instructor, either a free
+    one or by re-matching the cell's instructors with Hopcroft–Karp (each
+    class's current instructor listed first, so moves are rare).
+    """
+
+    def __init__(self, generated_schedule, conflicts, classes_to_schedule, parsed_instructors, parsed_rooms,
+                 index=None):
+        if index is None:
+            index = SchedulingIndex(parsed_instructors, parsed_rooms)
+        self.index = index
+        self.grid = grid = OccupancyGrid(parsed_instructors, parsed_rooms)
+
+        classes_by_key = {}
+        for class_info in classes_to_schedule:
+            key = (class_info['section_name'], class_info['subject_code'])
+            classes_by_key.setdefault(key, []).append(class_info)
+
+        # Cell -> list of [row, class_info]; rows we cannot map stay untouched
+        self.rows = [dict(row) for row in generated_schedule]
+        self.cell_members = {}
+        for row in self.rows:
+            section = grid.section_id(row['Section'])
+            if row['Instructor'] not in grid.instructor_ids or row['Room'] not in grid.room_ids \
+                    or (row['Day'], row['Time Slot']) not in grid.cell_ids:
+                continue
+            cell = grid.cell_ids[(row['Day'], row['Time Slot'])]
+            grid.book(grid.instructor_ids[row['Instructor']], grid.room_ids[row['Room']], section, cell)
+            matches = classes_by_key.get((row['Section'], row['Subject Code']))
+            self.cell_members.setdefault(cell, []).append([row, matches.pop(0) if matches else None])
+
+        self.retry = []
+        self.conflicts = []
+        for conflict in conflicts:
+            matches = classes_by_key.get((conflict.get('section'), conflict.get('subject')))
+            if conflict['type'] == 'Unscheduled Class' and conflict.get('reason') == NO_COMMON_SLOT_REASON \
+                    and matches:
+                self.retry.append(matches.pop(0))
+            else:
+                self.conflicts.append(conflict)
+
+    def _best_fit(self, cell, sizes):
+        rooms = assign_rooms_best_fit(self.grid.room_capacity[:, cell], sizes)
+        return None if -1 in rooms else rooms
+
+    def _set_rooms(self, cell, rows, rooms):
+        grid = self.grid
+        for row, room in zip(rows, rooms):
+            grid.room_busy[grid.room_ids[row['Room']]] &= ~(1 << cell)
+        for row, room in zip(rows, rooms):
+            grid.room_busy[room] |= 1 << cell
+            row['Room'] = grid.room_names[room]
+            row['Room Capacity'] = int(grid.room_capacity[room, cell])
+
+    def _reassign_cell(self, cell):
+        rows = [row for row, _ in self.cell_members.get(cell, [])]
+        rooms = self._best_fit(cell, [row['Students'] for row in rows])
+        if rooms is not None:
+            self._set_rooms(cell, rows, rooms)
+
+    def _instructors_with(self, cell, class_info):
+        """Instructor per member of the cell plus one for class_info, or None if no matching covers all."""
+        grid, bit = self.grid, 1 << cell
+        qualified = self.index.specialized_instructor_ids(class_info['required_specialization'])
+        for instructor in qualified:
+            if grid.instructor_avail[instructor] & bit and not grid.instructor_busy[instructor] & bit:
+                return [grid.instructor_ids[row['Instructor']] for row, _ in self.cell_members.get(cell, [])] \
+                    + [instructor]
+
+        instructor_slots = {}
+        adjacency = []
+        for row, info in self.cell_members.get(cell, []) + [[None, class_info]]:
+            candidates = [] if row is None else [grid.instructor_ids[row['Instructor']]]
+            if info is not None:
+                candidates += [i for i in self.index.specialized_instructor_ids(info['required_specialization'])
+                               if grid.instructor_avail[i] & bit and i not in candidates]
+            adjacency.append([instructor_slots.setdefault(i, len(instructor_slots)) for i in candidates])
+        matched = hopcroft_karp(adjacency, len(instructor_slots))
+        if -1 in matched:
+            return None
+        slot_instructors = list(instructor_slots)
+        return [slot_instructors[m] for m in matched]
+
+    def _try_place(self, class_info):
+        grid = self.grid
+        section = grid.section_id(class_info['section_name'])
+        for cell in range(len(grid.cells)):
+            if grid.section_busy[section] >> cell & 1:
+                continue
+            members = self.cell_members.get(cell, [])
+            sizes = [row['Students'] for row, _ in members] + [class_info['section_students']]
+            rooms = self._best_fit(cell, sizes)
+            if rooms is None:
+                continue
+            instructors = self._instructors_with(cell, class_info)
+            if instructors is None:
+                continue
+
+            bit = 1 << cell
+            for (row, _), instructor in zip(members, instructors):
+                grid.instructor_busy[grid.instructor_ids[row['Instructor']]] &= ~bit
+                row['Instructor'] = grid.instructor_names[instructor]
+            for instructor in instructors:
+                grid.instructor_busy[instructor] |= bit
+            grid.section_busy[section] |= bit
+            row = schedule_entry(grid, class_info, instructors[-1], rooms[-1], cell)
+            self.rows.append(row)
+            self.cell_members.setdefault(cell, []).append([row, class_info])
+            self._set_rooms(cell, [r for r, _ in members] + [row], rooms)
+            return True
+        return False
+
+    def run(self):
+        """
+        Re-assign rooms in every cell, then retry unscheduled classes largest first.
+
+        Returns:
+            tuple: (generated_schedule, conflicts, stats); stats report the
+                   wasted seats before and after and how many classes were placed.
+        """
+        start = time.perf_counter()
+        original_rows = list(self.rows)
+        wasted_before = sum(row['Room Capacity'] - row['Students'] for row in original_rows)
+        for cell in list(self.cell_members):
+            self._reassign_cell(cell)
+        wasted_after = sum(row['Room Capacity'] - row['Students'] for row in original_rows)
+
+        conflicts = list(self.conflicts)
+        placed = 0
+        for class_info in sorted(self.retry, key=lambda c: c.get('section_students', 0), reverse=True):
+            if self._try_place(class_info):
+                placed += 1
+            else:
+                conflicts.append(unscheduled_conflict(class_info, NO_COMMON_SLOT_REASON))
+
+        stats = {
+            'wasted_seats_before': wasted_before,
+            'wasted_seats_after': wasted_after,
+            'wasted_seats_removed': wasted_before - wasted_after,
+            'classes_placed': placed,
+            'solve_time': time.perf_counter() - start,
+        }
+        return self.rows, conflicts, stats
+
+
+def reoptimize_rooms(generated_schedule, conflicts, classes_to_schedule, parsed_instructors, parsed_rooms,
+                     index=None):
+    """Run RoomReassigner on a solver result; returns (generated_schedule, conflicts, stats)."""
+    reassigner = RoomReassigner(generated_schedule, conflicts, classes_to_schedule, parsed_instructors,
+                                parsed_rooms, index)
+    return reassigner.run()
@@ -0,0 +1,156 @@
+"""Project snapshots: every input table, the class list, the schedule, conflicts and manual fixes in one file."""
+import io
+import json
+import zipfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = 'insync'
+DEFAULT_COMPRESSION = 'zstd'
+
+# Tables a snapshot may hold; any of them can be absent
+SNAPSHOT_TABLES = ('sections', 'instructors', 'subjects', 'rooms', 'curriculum',
+                   'classes', 'schedule', 'manual_fixes')
+
+_MANIFEST = 'manifest.json'
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Project snapshots need pyarrow (pip install pyarrow).") from e
+    return pyarrow
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _arrow_table(pa, df):
+    """
+    (Arrow table, text columns) for df. Object columns mixing types (e.g.
+    'N/A (Forced)' among capacities) are stored as text and named in the
+    second item so load_snapshot can restore their numbers.
+    """
+    try:
+        return pa.Table.from_pandas(df), []
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        mixed = {column: df[column].map(lambda v: v if pd.isna(v) else str(v))
+                 for column in df.columns if df[column].dtype == object
+                 and any(not isinstance(v, str) for v in df[column].dropna())}
+        return pa.Table.from_pandas(df.assign(**mixed)), list(mixed)
+
+
+def _parse_number(value):
+    if not isinstance(value, str):
+        return value
+    for parse in (int, float):
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _restore_text_columns(df, columns):
+    """Turn the numbers _arrow_table stored as text back into ints and floats; other text is kept."""
+    restored = {column: df[column].map(_parse_number).astype(object) for column in columns if column in df.columns}
+    return df.assign(**restored) if restored else df
+
+
+class Snapshot:
+    """A loaded snapshot: tables (name -> DataFrame), conflicts (list of dicts) and metadata (dict)."""
+
+    def __init__(self, tables, conflicts, metadata, created_at):
+        self.tables = tables
+        self.conflicts = conflicts
+        self.metadata = metadata
+        self.created_at = created_at
+
+    def classes(self):
+        """The class list as the list of dicts get_classes_to_schedule returns, or None."""
+        classes_df = self.tables.get('classes')
+        return None if classes_df is None else classes_df.to_dict('records')
+
+
+def save_snapshot(tables, conflicts=(), metadata=None, compression=DEFAULT_COMPRESSION):
+    """
+    Serialize a project to bytes.
+
+    The file is an uncompressed zip holding one Arrow IPC file per table,
+    with Arrow's own buffer compression, plus a JSON manifest with the
+    conflicts and metadata. Categorical and small-integer dtypes survive the
+    round trip; so do numbers in mixed-type object columns such as 'Room
+    Capacity', which are stored as text and parsed back on load.
+
+    Args:
+        tables (dict): Name from SNAPSHOT_TABLES -> DataFrame; None values are skipped.
+            'classes' may also be given as the list of class dicts.
+
+    Returns:
+        bytes: The snapshot file contents.
+    """
+    pa = _require_pyarrow()
+    buffer = io.BytesIO()
+    stored = []
+    text_columns = {}
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name in SNAPSHOT_TABLES:
+            df = tables.get(name)
+            if df is None:
+                continue
+            if not isinstance(df, pd.DataFrame):
+                df = pd.DataFrame(list(df))
+            table, mixed = _arrow_table(pa, df)
+            if mixed:
+                text_columns[name] = mixed
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_file(sink, table.schema,
+                                 options=pa.ipc.IpcWriteOptions(compression=compression)) as writer:
+                writer.write_table(table)
+            archive.writestr(f"{name}.arrow", sink.getvalue().to_pybytes())
+            stored.append(name)
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'tables': stored,
+            'text_columns': text_columns,
+            'conflicts': list(conflicts or []),
+            'metadata': metadata or {},
+        }
+        archive.writestr(_MANIFEST, json.dumps(manifest, default=_to_json))
+    return buffer.getvalue()
+
+
+def load_snapshot(source):
+    """
+    Read a snapshot from bytes, a file-like object or a path.
+
+    Raises:
+        ValueError: If the file is not a snapshot or comes from a newer version.
+    """
+    pa = _require_pyarrow()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    try:
+        with zipfile.ZipFile(source) as archive:
+            manifest = json.loads(archive.read(_MANIFEST))
+            if manifest.get('version', 0) > SNAPSHOT_VERSION:
+                raise ValueError(f"Snapshot version {manifest['version']} is newer than this app supports.")
+            text_columns = manifest.get('text_columns', {})
+            tables = {}
+            for name in manifest['tables']:
+                reader = pa.ipc.open_file(pa.py_buffer(archive.read(f"{name}.arrow")))
+                tables[name] = _restore_text_columns(reader.read_all().to_pandas(), text_columns.get(name, ()))
+    except (zipfile.BadZipFile, KeyError, json.JSONDecodeError) as e:
+        raise ValueError(f"Not a project snapshot: {e}") from e
+    return Snapshot(tables, manifest['conflicts'], manifest['metadata'], manifest['created_at'])
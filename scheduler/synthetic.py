@@ -0,0 +1,160 @@
+"""Synthetic datasets in the five-CSV upload schema, at any scale and contention level."""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from scheduler.data import DEFAULT_INPUT_FILES, TIME_SLOTS_ORDER_24HR
+
+# Per unit of scale, roughly the shipped demo term
+BASE_SECTIONS = 130
+BASE_INSTRUCTORS = 50
+BASE_ROOMS = 20
+BASE_COURSES = 5
+BASE_SUBJECTS = 20
+
+YEAR_LEVELS = (1, 2, 3, 4)
+SUBJECTS_PER_YEAR = (2, 4)  # inclusive range of curriculum subjects per course and year
+SECTION_SIZE = (30, 50)
+SPECIALIZATIONS = ("Accounting", "English", "Finance", "Law", "Marketing", "Math", "Programming")
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+DEFAULT_AVAILABILITY_DENSITY = 0.22
+DEFAULT_ROOM_DENSITY = 0.42
+DEFAULT_CAPACITY_SPREAD = 8.0
+DEFAULT_SPECIALIZATION_SCARCITY = 0.1
+
+
+def generate_dataset(scale=1, availability_density=DEFAULT_AVAILABILITY_DENSITY, room_density=DEFAULT_ROOM_DENSITY,
+                     capacity_spread=DEFAULT_CAPACITY_SPREAD, specialization_scarcity=DEFAULT_SPECIALIZATION_SCARCITY,
+                     seed=0):
+    """
+    Build the five input tables for a synthetic term.
+
+    scale multiplies sections, instructors, rooms, courses and subjects, so
+    scale=1 is about the size of the shipped demo data. Contention knobs:
+
+    - availability_density: share of the week's (day, slot) cells each
+      instructor is available for
+    - room_density: share of the cells each room is offered in
+    - capacity_spread: standard deviation of room capacities around 45 seats
+      (rounded to 5); small spreads leave few rooms for the largest sections
+    - specialization_scarcity: 0 gives every instructor every specialization,
+      1 gives each a single one
+
+    Returns:
+        dict: Table name ('sections', 'instructors', 'subjects', 'rooms',
+              'curriculum') -> DataFrame, with the columns the app expects.
+    """
+    rng = np.random.default_rng(seed)
+    cells = [(day, slot) for day in DAYS for slot in TIME_SLOTS_ORDER_24HR]
+    n_cells = len(cells)
+    cell_days = np.array([day for day, _ in cells])
+    cell_slots = np.array([slot for _, slot in cells])
+
+    n_courses = max(1, round(BASE_COURSES * scale))
+    courses = [f"BS{c:03d}" for c in range(1, n_courses + 1)]
+    n_subjects = max(1, round(BASE_SUBJECTS * scale))
+    subject_codes = [f"SUBJ{s:04d}" for s in range(1, n_subjects + 1)]
+    subjects = pd.DataFrame({
+        'Subject Code': subject_codes,
+        'Subject Name': [f"Synthetic Subject {s}" for s in range(1, n_subjects + 1)],
+        'Required Specialization': rng.choice(SPECIALIZATIONS, size=n_subjects),
+    })
+
+    curriculum_rows = []
+    for course in courses:
+        for year in YEAR_LEVELS:
+            n = rng.integers(SUBJECTS_PER_YEAR[0], SUBJECTS_PER_YEAR[1] + 1)
+            for code in rng.choice(subject_codes, size=min(n, n_subjects), replace=False):
+                curriculum_rows.append((course, year, code))
+    curriculum = pd.DataFrame(curriculum_rows, columns=['Course', 'Year Level', 'Subject Code'])
+
+    n_sections = max(1, round(BASE_SECTIONS * scale))
+    section_course = rng.integers(0, n_courses, size=n_sections)
+    section_year = rng.choice(YEAR_LEVELS, size=n_sections)
+    sections = pd.DataFrame({
+        'Course': np.array(courses)[section_course],
+        'Year Level': section_year,
+        'Students': rng.integers(SECTION_SIZE[0], SECTION_SIZE[1] + 1, size=n_sections),
+    })
+    # Letters A, B, ... per (course, year), like "BS001-2C"
+    ordinal = sections.groupby(['Course', 'Year Level']).cumcount()
+    sections.insert(2, 'Section', sections['Course'] + '-' + sections['Year Level'].astype(str) + ordinal.map(_section_letters))
+
+    n_instructors = max(1, round(BASE_INSTRUCTORS * scale))
+    per_instructor = max(1, round(availability_density * n_cells))
+    n_specs = max(1, round((1 - specialization_scarcity) * (len(SPECIALIZATIONS) - 1)) + 1)
+    avail_cells = np.argsort(rng.random((n_instructors, n_cells)), axis=1)[:, :per_instructor]
+    held_specs = np.argsort(rng.random((n_instructors, len(SPECIALIZATIONS))), axis=1)[:, :n_specs]
+    # Each availability row names one held specialization, cycling so all of them appear
+    row_specs = held_specs[:, np.arange(per_instructor) % n_specs]
+    instructor_ids = np.repeat(np.arange(1, n_instructors + 1), per_instructor)
+    instructors = pd.DataFrame({
+        'Instructor': [f"Prof. Synthetic {i:05d}" for i in instructor_ids],
+        'Day': cell_days[avail_cells.ravel()],
+        'Time Slot': cell_slots[avail_cells.ravel()],
+        'From Department': np.array(courses)[rng.integers(0, n_courses, size=n_instructors)].repeat(per_instructor),
+        'Specialization': np.array(SPECIALIZATIONS)[row_specs.ravel()],
+    })
+
+    n_rooms = max(1, round(BASE_ROOMS * scale))
+    per_room = max(1, round(room_density * n_cells))
+    room_cells = np.argsort(rng.random((n_rooms, n_cells)), axis=1)[:, :per_room]
+    capacities = np.clip(np.round(rng.normal(45, capacity_spread, size=n_rooms * per_room) / 5) * 5, 20, 80)
+    room_ids = np.repeat(np.arange(n_rooms), per_room)
+    rooms = pd.DataFrame({
+        'Room': [f"SYN BLDG {r // 20 + 1} {101 + r % 20}" for r in room_ids],
+        'Day': cell_days[room_cells.ravel()],
+        'Time Slot': cell_slots[room_cells.ravel()],
+        'Max Capacity': capacities.astype(int),
+    })
+
+    return {'sections': sections, 'instructors': instructors, 'subjects': subjects,
+            'rooms': rooms, 'curriculum': curriculum}
+
+
+def _section_letters(n):
+    """0 -> 'A', 25 -> 'Z', 26 -> 'AA', like spreadsheet columns."""
+    letters = ''
+    n += 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def write_dataset(frames, out_dir):
+    """Write the tables under the default upload file names; returns the paths written."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for table, file_name in DEFAULT_INPUT_FILES.items():
+        path = os.path.join(out_dir, file_name)
+        frames[table].to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m scheduler.synthetic',
+        description="Write a synthetic dataset in the five-CSV upload schema.")
+    parser.add_argument('out_dir', help="Directory to write the CSVs to")
+    parser.add_argument('--scale', type=float, default=1, help="Size multiple of the demo term (default: 1)")
+    parser.add_argument('--availability-density', type=float, default=DEFAULT_AVAILABILITY_DENSITY)
+    parser.add_argument('--room-density', type=float, default=DEFAULT_ROOM_DENSITY)
+    parser.add_argument('--capacity-spread', type=float, default=DEFAULT_CAPACITY_SPREAD)
+    parser.add_argument('--specialization-scarcity', type=float, default=DEFAULT_SPECIALIZATION_SCARCITY)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    frames = generate_dataset(args.scale, args.availability_density, args.room_density, args.capacity_spread,
+                              args.specialization_scarcity, args.seed)
+    for path in write_dataset(frames, args.out_dir):
+        print(f"Wrote {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""Time-slot registry: each distinct slot string is parsed once into integer minutes and a display label."""
+import re
+import threading
+from typing import NamedTuple
+
+# The 1-hour teaching slots in 24-hour form; their registry ids are their positions
+TIME_SLOTS_ORDER_24HR = [
+    "7:00-8:00", "8:00-9:00", "9:00-10:00", "10:00-11:00",
+    "11:00-12:00", "12:00-13:00", "13:00-14:00", "14:00-15:00",
+    "15:00-16:00", "16:00-17:00", "17:00-18:00"  #if your schedule extends later
+]
+
+_SLOT_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$')
+
+
+class TimeSlot(NamedTuple):
+    slot_id: int
+    label: str          # canonical 'H:MM-H:MM', e.g. '9:00-10:00'
+    start_minute: int   # minutes after midnight
+    end_minute: int
+    display: str        # e.g. '9:00 AM - 10:00 AM'
+
+
+def _parse_minutes(text):
+    """(start_minute, end_minute) for 'H:MM-H:MM' style text, or None."""
+    match = _SLOT_PATTERN.match(str(text))
+    if match is None:
+        return None
+    start_h, start_m, end_h, end_m = (int(part) for part in match.groups())
+    if start_h > 23 or end_h > 23 or start_m > 59 or end_m > 59:
+        return None
+    return start_h * 60 + start_m, end_h * 60 + end_m
+
+
+def _clock_label(minute):
+    hour, minute = divmod(minute, 60)
+    return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+class TimeSlotRegistry:
+    """
+    Interns time slots by their (start, end) minutes.
+
+    Spellings of the same interval ('9:00-10:00', '09:00-10:00',
+    '9:00 - 10:00') share one TimeSlot, so every module can compare slot ids
+    or canonical labels instead of raw strings. Each raw string is parsed
+    once; later lookups are a dict hit. Strings that are not 'H:MM-H:MM'
+    have no slot and pass through unchanged.
+    """
+
+    def __init__(self, ordered_labels=TIME_SLOTS_ORDER_24HR):
+        self.slots = []
+        self._by_minutes = {}
+        self._by_text = {}
+        self._lock = threading.Lock()
+        for label in ordered_labels:
+            self.lookup(label)
+
+    def lookup(self, text):
+        """The TimeSlot for text, or None when it is not a time range."""
+        try:
+            return self._by_text[text]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable
+            return None
+        minutes = _parse_minutes(text)
+        with self._lock:
+            slot = None
+            if minutes is not None:
+                slot = self._by_minutes.get(minutes)
+                if slot is None:
+                    start, end = minutes
+                    slot = TimeSlot(len(self.slots), f"{start // 60}:{start % 60:02d}-{end // 60}:{end % 60:02d}",
+                                    start, end, f"{_clock_label(start)} - {_clock_label(end)}")
+                    self.slots.append(slot)
+                    self._by_minutes[minutes] = slot
+            self._by_text[text] = slot
+        return slot
+
+    def slot_id(self, text):
+        slot = self.lookup(text)
+        return None if slot is None else slot.slot_id
+
+    def canonical(self, text):
+        """Canonical label for text, or text itself when it is not a time range."""
+        slot = self.lookup(text)
+        return text if slot is None else slot.label
+
+    def display(self, text):
+        """12-hour display label for text, or text itself when it is not a time range."""
+        slot = self.lookup(text)
+        return text if slot is None else slot.display
+
+    def sort_key(self, text):
+        """Orders slots by start then end minute, with non-slot strings last."""
+        slot = self.lookup(text)
+        return (0, slot.start_minute, slot.end_minute, '') if slot is not None else (1, 0, 0, str(text))
+
+    def canonical_list(self, values):
+        """canonical() over a sequence, parsing each distinct value once."""
+        mapping = {value: self.canonical(value) for value in set(values)}
+        return [mapping[value] for value in values]
+
+
+SLOT_REGISTRY = TimeSlotRegistry()
+
+
+def format_time_slot_for_display(time_slot_24hr):
+    """Converts a 'HH:MM-HH:MM' 24-hour string to 'H:MM AM/PM - H:MM AM/PM' (memoized per string)."""
+    return SLOT_REGISTRY.display(time_slot_24hr)
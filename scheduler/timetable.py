@@ -0,0 +1,206 @@
+"""Data-level timetable grid: the classes in each (time slot, day) cell, with HTML and plain-text renderers."""
+import zlib
+from typing import NamedTuple
+
+import pandas as pd
+
+from scheduler.data import DAYS_ORDER
+from scheduler.timeslots import SLOT_REGISTRY, TIME_SLOTS_ORDER_24HR
+
+ENTITY_TYPES = ('Room', 'Section', 'Instructor')
+
+# Instructor names are cut to this length inside the fixed-width on-screen cells
+HTML_INSTRUCTOR_MAX_LENGTH = 30
+
+_SLOTS = frozenset(TIME_SLOTS_ORDER_24HR)
+_DAYS = frozenset(DAYS_ORDER)
+
+_CELL_STYLE = ("color: white; padding: 8px; border-radius: 5px; "
+               "font-weight: 500; text-shadow: 1px 1px 2px rgba(0,0,0,0.2);")
+
+# Distinct cell colors, handed out to subjects in sorted code order
+SUBJECT_COLOR_PALETTE = (
+    '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57',
+    '#FF9FF3', '#54A0FF', '#48DBFB', '#1DD1A1', '#FFA502',
+    '#5F27CD', '#00D2D3', '#A29BFE', '#FD79A8', '#FDCB6E',
+    '#6C5CE7', '#A8E6CF', '#FFD3B6', '#FF8B94', '#C7CEEA',
+    '#B2EBF2', '#DCEDC8', '#FFE0B2', '#F8BBD0', '#E1BEE7',
+    '#C5E1A5', '#FFCCBC', '#D7CCC8', '#CFD8DC', '#B39DDB',
+)
+
+
+def stable_palette_index(subject_code, palette_size=len(SUBJECT_COLOR_PALETTE)):
+    """Palette position from a CRC-32 of the code; unlike hash(), the same in every process."""
+    return zlib.crc32(str(subject_code).encode('utf-8')) % palette_size
+
+
+class SubjectColorMap:
+    """
+    Subject code -> palette color, plus the opening <div> tag of its timetable cells.
+
+    The codes given up front take palette positions in sorted order, wrapping
+    after the last color, so a schedule keeps the colors it has always had;
+    any other code falls back to stable_palette_index. Lookups are dict hits
+    and never change the map's assignments. Build one per schedule and share it
+    between renders (it is safe to read from several threads).
+    """
+
+    def __init__(self, subject_codes=(), palette=SUBJECT_COLOR_PALETTE):
+        self.palette = tuple(palette)
+        codes = sorted({str(code) for code in subject_codes})
+        self._index = {code: i % len(self.palette) for i, code in enumerate(codes)}
+        self._open_tags = {code: self._open_tag(code) for code in codes}
+
+    @classmethod
+    def from_schedule(cls, schedule_df):
+        """Map over every subject code in schedule_df."""
+        if schedule_df is None or 'Subject Code' not in schedule_df.columns:
+            return cls()
+        return cls(schedule_df['Subject Code'].dropna().unique().tolist())
+
+    def __len__(self):
+        return len(self._index)
+
+    def palette_index(self, subject_code):
+        code = str(subject_code)
+        index = self._index.get(code)
+        return stable_palette_index(code, len(self.palette)) if index is None else index
+
+    def color(self, subject_code):
+        return self.palette[self.palette_index(subject_code)]
+
+    def _open_tag(self, code):
+        return f'<div style="background-color: {self.color(code)}; {_CELL_STYLE}">'
+
+    def cell_open_tag(self, subject_code):
+        """The styled opening <div> for a class of this subject; formatted once per subject."""
+        code = str(subject_code)
+        tag = self._open_tags.get(code)
+        if tag is None:
+            tag = self._open_tags[code] = self._open_tag(code)
+        return tag
+
+
+class TimetableEntry(NamedTuple):
+    subject_code: str
+    section: str
+    instructor: str
+    room: str
+
+
+class TimetableGrid:
+    """
+    The classes of a (possibly filtered) schedule, by time slot and day.
+
+    cells maps (canonical slot label, upper-case day) to TimetableEntry tuples
+    in schedule order. entity_type ('Room', 'Section', 'Instructor' or None)
+    is the view the grid was built for and decides which details each class
+    shows: a room's timetable names the section and instructor, and so on.
+    """
+
+    def __init__(self, entity_type, cells):
+        self.entity_type = entity_type
+        self.cells = cells
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.cells.values())
+
+    def used_slots(self):
+        """Slots holding at least one class, in clock order."""
+        return [slot for slot in TIME_SLOTS_ORDER_24HR if any((slot, day) in self.cells for day in DAYS_ORDER)]
+
+    def details(self, entry, instructor_max_length=None):
+        """Labelled detail lines shown under the subject code, e.g. ['Room: R1', 'Prof: Cruz']."""
+        instructor = entry.instructor[:instructor_max_length] if instructor_max_length else entry.instructor
+        if self.entity_type == "Room":
+            return [f"Sec: {entry.section}", f"Prof: {instructor}"]
+        if self.entity_type == "Section":
+            return [f"Room: {entry.room}", f"Prof: {instructor}"]
+        if self.entity_type == "Instructor":
+            return [f"Room: {entry.room}", f"Sec: {entry.section}"]
+        return [entry.section, instructor, entry.room]
+
+    def rows(self, render_cell, slots=None):
+        """
+        One list per slot of render_cell(entries) for each occupied cell and ''
+        elsewhere, in DAYS_ORDER; slots defaults to every teaching slot.
+        """
+        slots = TIME_SLOTS_ORDER_24HR if slots is None else slots
+        return [[render_cell(self.cells[slot, day]) if (slot, day) in self.cells else '' for day in DAYS_ORDER]
+                for slot in slots]
+
+    def to_frame(self, render_cell, slots=None):
+        """DataFrame (display slot label x day) of rows(render_cell, slots)."""
+        slots = TIME_SLOTS_ORDER_24HR if slots is None else slots
+        return pd.DataFrame(self.rows(render_cell, slots), index=[SLOT_REGISTRY.display(slot) for slot in slots],
+                            columns=DAYS_ORDER, dtype=object)
+
+
+def _text_column(rows, column):
+    # Plain str() per value: a filtered view is usually a handful of rows,
+    # where pandas' per-call overhead would dominate
+    if column not in rows.columns:
+        return ['N/A'] * len(rows)
+    return [str(value) for value in rows[column].tolist()]
+
+
+def build_timetable(schedule_df, entity_type=None, selected_entity=None):
+    """
+    TimetableGrid for schedule_df, keeping only selected_entity's classes when
+    entity_type is a Room, Section or Instructor view and an entity other than
+    'All' is chosen. Slots are matched by their minutes, days case-insensitively;
+    classes outside the teaching slots or week are left out. schedule_df is not
+    modified.
+    """
+    cells = {}
+    if schedule_df is None or schedule_df.empty:
+        return TimetableGrid(entity_type, cells)
+
+    rows = schedule_df
+    if entity_type in ENTITY_TYPES and selected_entity and selected_entity != "All" and entity_type in rows.columns:
+        rows = rows[rows[entity_type] == selected_entity]
+
+    slots = SLOT_REGISTRY.canonical_list(rows['Time Slot'].tolist())
+    days = [day.upper() for day in _text_column(rows, 'Day')]
+    fields = [_text_column(rows, column) for column in ('Subject Code', 'Section', 'Instructor', 'Room')]
+    for slot, day, *entry in zip(slots, days, *fields):
+        if slot in _SLOTS and day in _DAYS:
+            cells.setdefault((slot, day), []).append(TimetableEntry(*entry))
+    return TimetableGrid(entity_type, cells)
+
+
+def render_html_grid(grid, subject_colors):
+    """
+    Grid of color-coded HTML cells for the on-screen and printable timetables,
+    colored by subject_colors (a SubjectColorMap). Classes sharing a cell stack
+    in schedule order, all but the first with a top margin.
+    """
+    def class_html(entry):
+        details = ''.join(f"<br>{line}" for line in grid.details(entry, HTML_INSTRUCTOR_MAX_LENGTH))
+        return (f'{subject_colors.cell_open_tag(entry.subject_code)}'
+                f'<strong>{entry.subject_code}</strong>{details}</div>')
+
+    def cell_html(entries):
+        first, *stacked = (class_html(entry) for entry in entries)
+        return first + ''.join(f'<div style="margin-top: 4px;">{html}</div>' for html in stacked)
+
+    return grid.to_frame(cell_html)
+
+
+def render_text_grid(grid):
+    """Grid of plain-text cells, one line per subject code or detail, for spreadsheet export."""
+    return grid.to_frame(
+        lambda entries: '\n'.join(line for entry in entries for line in [entry.subject_code, *grid.details(entry)]))
+
+
+def render_csv_timetable(grid):
+    """
+    Compact timetable with a 'Time' column and one row per occupied slot; each
+    class is 'CODE | detail | detail' and classes sharing a cell are joined by ' || '.
+    """
+    slots = grid.used_slots()
+    rows = grid.rows(
+        lambda entries: ' || '.join(' | '.join([entry.subject_code, *grid.details(entry)]) for entry in entries),
+        slots)
+    return pd.DataFrame([[SLOT_REGISTRY.display(slot), *row] for slot, row in zip(slots, rows)],
+                        columns=['Time', *DAYS_ORDER], dtype=object)
@@ -0,0 +1,67 @@
+"""Post-solve double-booking checks over a finished schedule."""
+
+# (conflict type, schedule column, conflict dict key) per resource kind
+DOUBLE_BOOKING_CHECKS = [
+    ('Teacher Double Booking', 'Instructor', 'instructor'),
+    ('Room Double Booking', 'Room', 'room'),
+    ('Section Double Booking', 'Section', 'section'),
+]
+
+
+def find_double_bookings(schedule_df):
+    """
+    Report every teacher, room and section booked twice in the same day and time slot.
+
+    Uses duplicated() + groupby instead of a pairwise scan, so the check is
+    O(n log n) in the number of scheduled rows. Each colliding group yields one
+    conflict listing all of its classes. Days are compared case-insensitively
+    since forced assignments store them upper-cased.
+
+    Returns:
+        list: Conflict dicts with 'type', the resource key, 'day', 'time_slot'
+              and 'classes_involved'.
+    """
+    conflicts = []
+    if schedule_df is None or schedule_df.empty:
+        return conflicts
+
+    keyed = schedule_df.assign(_day=schedule_df['Day'].astype(str).str.upper())
+    labels = keyed['Subject Code'].astype(str) + ' (' + keyed['Section'].astype(str) + ')'
+
+    for conflict_type, column, key in DOUBLE_BOOKING_CHECKS:
+        if column not in keyed.columns:
+            continue
+        group_keys = [column, '_day', 'Time Slot']
+        colliding = keyed.duplicated(group_keys, keep=False)
+        if not colliding.any():
+            continue
+        grouped = (
+            labels[colliding]
+            .groupby([keyed.loc[colliding, k] for k in group_keys], dropna=False)
+            .agg(' and '.join)
+        )
+        for (entity, day, time_slot), classes_involved in grouped.items():
+            conflicts.append({
+                'type': conflict_type,
+                key: entity,
+                'day': day,
+                'time_slot': time_slot,
+                'classes_involved': classes_involved
+            })
+
+    return conflicts
+
+
+def double_booking_rows(schedule_df, conflict):
+    """
+    The rows of schedule_df behind a find_double_bookings conflict: every class
+    booked on its teacher, room or section at its day (any case) and time slot.
+    Empty for other conflict types.
+    """
+    for conflict_type, column, key in DOUBLE_BOOKING_CHECKS:
+        if conflict.get('type') == conflict_type and column in schedule_df.columns:
+            mask = ((schedule_df[column] == conflict.get(key))
+                    & (schedule_df['Day'].astype(str).str.upper() == str(conflict.get('day')).upper())
+                    & (schedule_df['Time Slot'] == conflict.get('time_slot')))
+            return schedule_df[mask]
+    return schedule_df.iloc[0:0]